@@ -1,43 +1,44 @@
 import openai
 from typing import List, Dict
 import json
+from ai_functions.prompt_compaction import PromptSummary
 
 class AICategorizer:
-    def __init__(self, api_key: str, logger):
+    def __init__(self, api_key: str, logger, token_budget: int = 1500):
         self.api_key = api_key
         self.logger = logger
+        self.token_budget = token_budget
         openai.api_key = api_key
     
     def generate_categories(self, files: List[Dict]) -> Dict:
-        """Generate custom categories based on file content"""
+        """Generate custom categories for all files from a compact statistical summary"""
         if not self.api_key:
             return {"error": "API key not configured"}
         
         try:
-            # Prepare file information for AI
-            file_info = "\n".join([
-                f"{file['name']} (Type: {file['type']}, Size: {file['size']} bytes)"
-                for file in files[:20]  # Limit to 20 files for the prompt
-            ])
+            # Summarize the whole file set within a fixed token budget
+            summary = PromptSummary(files, self.token_budget)
+            self.logger.debug(f"AI categorization prompt uses ~{summary.tokens} tokens for {len(files)} files")
             
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that suggests logical folder structures for organizing files."},
-                    {"role": "user", "content": f"""Based on these files, suggest a folder structure that would make sense for organization.
-                    Files:
-                    {file_info}
+                    {"role": "user", "content": f"""Based on this summary of a folder, suggest a folder structure that would make sense for organization.
+                    {summary.text}
                     
                     Please respond with a JSON object containing a 'categories' key with an array of category names,
-                    and a 'files' key that maps each filename to one of these categories.
+                    and a 'patterns' key that maps each pattern id (P1, P2, ...) to one of these categories.
                     """}
                 ],
                 temperature=0.7,
                 max_tokens=1000
             )
             
-            result = response.choices[0].message.content
-            return json.loads(result)
+            result = json.loads(response.choices[0].message.content)
+            # Map the per-pattern answer back onto every file
+            result["files"] = summary.expand(result.get("patterns", {}))
+            return result
         
         except Exception as e:
             self.logger.error(f"AI categorization error: {e}")
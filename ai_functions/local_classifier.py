@@ -0,0 +1,155 @@
+import os
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+# Byte bigrams are hashed into 2**_HASH_BITS feature buckets
+_HASH_BITS = 12
+_HASH_MULTIPLIER = 2654435761
+FEATURE_DIMS = 1 << _HASH_BITS
+
+
+class LocalClassifier:
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_bytes: int = 4096,
+        min_confidence: float = 0.35,
+        max_training_files: int = 200,
+        workers: int = 8,
+        batch_size: int = 1024
+    ):
+        """
+        Offline nearest-centroid classifier over TF-IDF weighted byte bigrams
+        Trained from folders that have already been organized, no network required
+        Files are classified batch_size at a time, which bounds memory use
+        """
+        self.logger = logger
+        self.sample_bytes = sample_bytes
+        self.min_confidence = min_confidence
+        self.max_training_files = max_training_files
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.categories: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+        self.idf: Optional[np.ndarray] = None
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, dest_dir: str, exclude: tuple = ("others",)) -> bool:
+        """
+        Build one centroid per category folder found under the destination
+        Returns True if at least two categories had training samples
+        """
+        paths_by_category: Dict[str, List[str]] = {}
+        try:
+            for entry in os.scandir(dest_dir):
+                if not entry.is_dir() or entry.name in exclude:
+                    continue
+                paths = self._collect_samples(entry.path)
+                if paths:
+                    paths_by_category[entry.name] = paths
+        except OSError as e:
+            self.logger.error(f"Could not read training folders in {dest_dir}: {e}")
+            return False
+
+        if len(paths_by_category) < 2:
+            self.logger.info("Not enough organized categories to train the local classifier")
+            return False
+
+        categories = sorted(paths_by_category)
+        all_paths = [p for c in categories for p in paths_by_category[c]]
+        labels = np.repeat(
+            np.arange(len(categories)),
+            [len(paths_by_category[c]) for c in categories]
+        )
+        counts = self._featurize(all_paths)
+
+        # Inverse document frequency over the training set
+        document_freq = np.count_nonzero(counts, axis=0)
+        self.idf = np.log((1 + len(all_paths)) / (1 + document_freq)) + 1.0
+
+        vectors = self._normalize(counts * self.idf)
+        centroids = np.zeros((len(categories), FEATURE_DIMS), dtype=np.float32)
+        np.add.at(centroids, labels, vectors)
+        self.centroids = self._normalize(centroids)
+        self.categories = categories
+        self.logger.info(
+            f"Local classifier trained on {len(all_paths)} files in {len(categories)} categories"
+        )
+        return True
+
+    def classify(self, files: List[Dict]) -> List[Optional[str]]:
+        """
+        Predict a category for each file, batch_size files at a time
+        Returns None for files below the confidence threshold
+        """
+        if not self.trained or not files:
+            return [None] * len(files)
+
+        predictions: List[Optional[str]] = []
+        for start in range(0, len(files), self.batch_size):
+            batch = files[start:start + self.batch_size]
+            vectors = self._normalize(self._featurize([f['path'] for f in batch]) * self.idf)
+            scores = vectors @ self.centroids.T
+            best = scores.argmax(axis=1)
+            confidence = scores[np.arange(len(batch)), best]
+            predictions.extend(
+                self.categories[b] if c >= self.min_confidence else None
+                for b, c in zip(best.tolist(), confidence.tolist())
+            )
+        return predictions
+
+    def _collect_samples(self, folder: str) -> List[str]:
+        """
+        Pick up to max_training_files files from a category folder
+        """
+        paths = []
+        for root, _, names in os.walk(folder):
+            for name in names:
+                paths.append(os.path.join(root, name))
+                if len(paths) >= self.max_training_files:
+                    return paths
+        return paths
+
+    def _featurize(self, paths: List[str]) -> np.ndarray:
+        """
+        Read a leading sample of every file in parallel and count hashed byte bigrams
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            samples = list(pool.map(self._read_sample, paths))
+
+        # Hash every bigram of every sample into (row, bucket) and count them in one pass
+        rows, buckets = [], []
+        for row, sample in enumerate(samples):
+            if len(sample) < 2:
+                continue
+            data = np.frombuffer(sample, dtype=np.uint8).astype(np.uint64)
+            bigrams = (data[:-1] << 8) | data[1:]
+            buckets.append(((bigrams * _HASH_MULTIPLIER) & 0xFFFFFFFF) >> (32 - _HASH_BITS))
+            rows.append(np.full(len(bigrams), row, dtype=np.uint64))
+
+        counts = np.zeros(len(paths) * FEATURE_DIMS, dtype=np.float32)
+        if buckets:
+            flat = np.concatenate(rows) * FEATURE_DIMS + np.concatenate(buckets)
+            counts += np.bincount(flat.astype(np.int64), minlength=counts.size)
+        counts = counts.reshape(len(paths), FEATURE_DIMS)
+        # Sublinear term frequency so long runs of one byte pair do not dominate
+        return np.log1p(counts)
+
+    def _read_sample(self, path: str) -> bytes:
+        try:
+            with open(path, 'rb') as f:
+                return f.read(self.sample_bytes)
+        except OSError as e:
+            self.logger.debug(f"Could not sample {path}: {e}")
+            return b""
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
@@ -0,0 +1,215 @@
+import re
+import zlib
+import numpy as np
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+# Placeholders for variable parts of names; they count as weak features
+DATE_TOKEN = "<date>"
+NUMBER_TOKEN = "<num>"
+
+_DATE = re.compile(
+    r'(?<!\d)(?:19|20)\d{2}[-_.]?(?:0[1-9]|1[0-2])[-_.]?(?:0[1-9]|[12]\d|3[01])(?!\d)'
+)
+_CAMEL = re.compile(r'([a-z])([A-Z])')
+_DIGITS = re.compile(r'\d+')
+_SPLIT = re.compile(r'[^a-z0-9<>]+')
+
+# Feature weights: the leading token (prefixes like invoice_, IMG_) matters most
+_PREFIX_WEIGHT = 2.0
+_WORD_WEIGHT = 1.0
+_PLACEHOLDER_WEIGHT = 0.3
+_EXTENSION_WEIGHT = 1.0
+
+
+def tokenize_name(name: str) -> Tuple[List[str], str]:
+    """
+    Split a filename into lowercase word tokens, with dates and numbers replaced by placeholders
+    e.g. "Screenshot 2023-04-01 at 10.15.22.png" -> (["screenshot", "<date>", "at", "<num>", ...], ".png")
+    Returns (tokens, extension)
+    """
+    path = Path(name)
+    stem = _CAMEL.sub(r'\1 \2', path.stem)
+    stem = _DATE.sub(f" {DATE_TOKEN} ", stem)
+    stem = _DIGITS.sub(f" {NUMBER_TOKEN} ", stem.lower())
+    tokens = [t for t in _SPLIT.split(stem) if t and (len(t) > 1 or t.startswith('<'))]
+    return tokens, path.suffix.lower()
+
+
+class NameClusterer:
+    def __init__(
+        self,
+        logger,
+        similarity: float = 0.6,
+        min_cluster_size: int = 3,
+        max_clusters: int = 200,
+        dimensions: int = 256,
+        block_size: int = 4096
+    ):
+        """
+        Propose custom categories without an AI service by clustering similar filenames
+        Names are reduced to token patterns, embedded as hashed TF-IDF vectors and grouped
+        by cosine similarity to cluster leaders, one block of patterns at a time
+        """
+        self.logger = logger
+        self.similarity = similarity
+        self.min_cluster_size = min_cluster_size
+        self.max_clusters = max_clusters
+        self.dimensions = dimensions
+        self.block_size = block_size
+
+    def generate_categories(self, files: List[Dict]) -> Dict:
+        """
+        Cluster all file names into proposed categories
+        Returns the same shape as AICategorizer.generate_categories:
+        'categories' (largest first) and 'files' mapping each name to a category
+        """
+        if not files:
+            return {"categories": [], "files": {}}
+        try:
+            # Identical token patterns are clustered once
+            patterns: Dict[Tuple, int] = {}
+            pattern_of = np.empty(len(files), dtype=np.int64)
+            for i, file in enumerate(files):
+                tokens, extension = tokenize_name(file['name'])
+                key = (tuple(tokens), extension)
+                pattern_of[i] = patterns.setdefault(key, len(patterns))
+            keys = list(patterns)
+            counts = np.bincount(pattern_of, minlength=len(keys))
+
+            labels = self._cluster(keys, counts)
+            names = self._name_clusters(keys, counts, labels)
+
+            mapping = {}
+            sizes = Counter()
+            for file, pattern in zip(files, pattern_of):
+                category = names[labels[pattern]]
+                mapping[file['name']] = category
+                sizes[category] += 1
+            return {
+                "categories": [category for category, _ in sizes.most_common()],
+                "files": mapping,
+            }
+        except Exception as e:
+            self.logger.error(f"Filename clustering error: {e}")
+            return {"error": str(e)}
+
+    def _vectors(self, keys: List[Tuple], counts: np.ndarray) -> np.ndarray:
+        """
+        Hashed, IDF-weighted and L2-normalized feature vectors, one row per pattern
+        """
+        rows, cols, weights = [], [], []
+        columns: Dict[str, int] = {}
+
+        def column(feature: str) -> int:
+            col = columns.get(feature)
+            if col is None:
+                col = columns[feature] = zlib.crc32(feature.encode('utf-8')) % self.dimensions
+            return col
+
+        for row, (tokens, extension) in enumerate(keys):
+            for position, token in enumerate(tokens):
+                placeholder = token.startswith('<')
+                weight = _PLACEHOLDER_WEIGHT if placeholder else _WORD_WEIGHT
+                rows.append(row)
+                cols.append(column(token))
+                weights.append(weight)
+                if position == 0 and not placeholder:
+                    rows.append(row)
+                    cols.append(column("^" + token))
+                    weights.append(_PREFIX_WEIGHT)
+            rows.append(row)
+            cols.append(column("ext:" + extension))
+            weights.append(_EXTENSION_WEIGHT)
+
+        matrix = np.zeros((len(keys), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows), np.array(cols)), np.array(weights, dtype=np.float32))
+
+        # Features present in most names carry little information
+        document_freq = ((matrix > 0) * counts[:, None]).sum(axis=0)
+        idf = np.log((1 + counts.sum()) / (1 + document_freq)) + 1
+        matrix *= idf.astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _cluster(self, keys: List[Tuple], counts: np.ndarray) -> np.ndarray:
+        """
+        Leader clustering: patterns, most frequent first, join the most similar leader
+        or start a new cluster; patterns left over once max_clusters is reached get -1
+        """
+        vectors = self._vectors(keys, counts)
+        order = np.argsort(-counts, kind='stable')
+        labels = np.full(len(keys), -1, dtype=np.int64)
+        leaders = np.empty((0, self.dimensions), dtype=np.float32)
+
+        for start in range(0, len(order), self.block_size):
+            block = order[start:start + self.block_size]
+            block_vectors = vectors[block]
+
+            # Join existing clusters in one matrix product
+            if len(leaders):
+                similarity = block_vectors @ leaders.T
+                best = similarity.argmax(axis=1)
+                joined = similarity[np.arange(len(block)), best] >= self.similarity
+                labels[block[joined]] = best[joined]
+            else:
+                joined = np.zeros(len(block), dtype=bool)
+
+            # Remaining patterns form new clusters among themselves
+            pending = np.flatnonzero(~joined)
+            if not len(pending) or len(leaders) >= self.max_clusters:
+                continue
+            within = block_vectors[pending] @ block_vectors[pending].T
+            unassigned = np.ones(len(pending), dtype=bool)
+            new_leaders = []
+            for i in range(len(pending)):
+                if not unassigned[i]:
+                    continue
+                if len(leaders) + len(new_leaders) >= self.max_clusters:
+                    break
+                members = unassigned & (within[i] >= self.similarity)
+                members[i] = True
+                labels[block[pending[members]]] = len(leaders) + len(new_leaders)
+                unassigned &= ~members
+                new_leaders.append(block_vectors[pending[i]])
+            if new_leaders:
+                leaders = np.vstack([leaders, np.array(new_leaders)])
+        return labels
+
+    def _name_clusters(self, keys: List[Tuple], counts: np.ndarray, labels: np.ndarray) -> Dict[int, str]:
+        """
+        Name each cluster after the words most of its files share
+        Small clusters and unclustered patterns become 'misc'; clusters with the same name merge
+        """
+        words: Dict[int, Counter] = defaultdict(Counter)
+        leading: Dict[int, Counter] = defaultdict(Counter)
+        extensions: Dict[int, Counter] = defaultdict(Counter)
+        sizes = Counter()
+        for (tokens, extension), count, label in zip(keys, counts, labels):
+            if label < 0:
+                continue
+            sizes[label] += int(count)
+            # Very short words ("at", "of") make poor folder names
+            words[label].update({t: int(count) for t in set(tokens) if len(t) > 2 and not t.startswith('<')})
+            if tokens:
+                leading[label][tokens[0]] += int(count)
+            extensions[label][extension] += int(count)
+
+        names = {-1: "misc"}
+        for label, size in sizes.items():
+            if size < self.min_cluster_size:
+                names[label] = "misc"
+                continue
+            shared = [w for w, n in words[label].most_common(2) if n >= size / 2]
+            # A shared prefix such as "invoice" or "img" leads the name
+            prefix = leading[label].most_common(1)[0][0] if leading[label] else None
+            if prefix in shared:
+                shared.remove(prefix)
+                shared.insert(0, prefix)
+            if shared:
+                names[label] = "_".join(shared)
+            else:
+                extension = extensions[label].most_common(1)[0][0].lstrip('.')
+                names[label] = f"{extension}_files" if extension else "misc"
+        return names
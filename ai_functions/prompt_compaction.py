@@ -0,0 +1,127 @@
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List, Dict
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _ENCODING = None
+
+# Size buckets used in the summary, upper bounds in bytes
+SIZE_BUCKETS = [
+    ("<10KB", 10 * 1024),
+    ("10KB-1MB", 1024 * 1024),
+    ("1-100MB", 100 * 1024 * 1024),
+    ("100MB-1GB", 1024 * 1024 * 1024),
+    (">1GB", float("inf")),
+]
+
+_DIGITS = re.compile(r'\d+')
+_TOKEN_SPLIT = re.compile(r'[\s_\-.()\[\]]+')
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens with tiktoken when installed, else estimate ~4 characters per token
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def name_pattern(file: Dict) -> str:
+    """
+    Reduce a filename to a pattern: digit runs become '#', case is folded
+    e.g. "IMG_20230101_1234.JPG" -> "img_#_#.jpg"
+    """
+    return _DIGITS.sub('#', file.get('name', '')).lower()
+
+
+def _size_bucket(size: int) -> str:
+    for label, limit in SIZE_BUCKETS:
+        if size < limit:
+            return label
+    return SIZE_BUCKETS[-1][0]
+
+
+class PromptSummary:
+    def __init__(self, files: List[Dict], token_budget: int = 1500, samples_per_pattern: int = 2):
+        """
+        Statistical summary of a file set for AI prompts
+        Groups files by name pattern so prompt size stays fixed however many files there are
+        """
+        self.files = files
+        self.token_budget = token_budget
+        self.samples_per_pattern = samples_per_pattern
+        self.pattern_ids: Dict[str, str] = {}
+        self.text = self._build()
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.text)
+
+    def _build(self) -> str:
+        groups: Dict[str, List[Dict]] = defaultdict(list)
+        extensions = Counter()
+        sizes = Counter()
+        name_tokens = Counter()
+        for file in self.files:
+            groups[name_pattern(file)].append(file)
+            extensions[file.get('extension') or '(none)'] += 1
+            sizes[_size_bucket(file.get('size', 0))] += 1
+            stem = Path(file.get('name', '')).stem.lower()
+            name_tokens.update(
+                t for t in _TOKEN_SPLIT.split(_DIGITS.sub(' ', stem)) if len(t) > 2
+            )
+
+        header = [
+            f"Total files: {len(self.files)}",
+            "Extensions: " + ", ".join(f"{ext} x{n}" for ext, n in extensions.most_common(15)),
+            "Sizes: " + ", ".join(f"{label} x{sizes[label]}" for label, _ in SIZE_BUCKETS if sizes[label]),
+            "Common name words: " + ", ".join(t for t, _ in name_tokens.most_common(20)),
+            "Name patterns (# = digits), with count and examples:",
+        ]
+        lines = list(header)
+        used = count_tokens("\n".join(lines))
+
+        # Largest patterns first; stop adding once the token budget is spent
+        for pattern, members in sorted(groups.items(), key=lambda g: -len(g[1])):
+            pattern_id = f"P{len(self.pattern_ids) + 1}"
+            examples = "; ".join(
+                f"{m['name']} ({m.get('type', 'unknown')})" for m in members[:self.samples_per_pattern]
+            )
+            line = f"{pattern_id}: {pattern} x{len(members)} e.g. {examples}"
+            cost = count_tokens(line) + 1
+            if used + cost > self.token_budget and self.pattern_ids:
+                remaining = len(groups) - len(self.pattern_ids)
+                lines.append(f"... {remaining} smaller patterns omitted")
+                break
+            lines.append(line)
+            used += cost
+            self.pattern_ids[pattern_id] = pattern
+        return "\n".join(lines)
+
+    def expand(self, pattern_categories: Dict[str, str], default: str = "others") -> Dict[str, str]:
+        """
+        Map categories chosen per pattern id back onto every file name
+        Files in omitted or unassigned patterns take the category most often
+        chosen for their extension, else the default
+        """
+        by_pattern = {
+            self.pattern_ids[pid]: category
+            for pid, category in pattern_categories.items()
+            if pid in self.pattern_ids
+        }
+        extension_votes: Dict[str, Counter] = defaultdict(Counter)
+        for pattern, category in by_pattern.items():
+            extension_votes[Path(pattern).suffix][category] += 1
+        by_extension = {ext: votes.most_common(1)[0][0] for ext, votes in extension_votes.items()}
+
+        mapping = {}
+        for file in self.files:
+            pattern = name_pattern(file)
+            category = by_pattern.get(pattern) or by_extension.get(Path(pattern).suffix, default)
+            mapping[file['name']] = category
+        return mapping
@@ -1,10 +1,12 @@
 import openai
 from typing import List, Dict
+from ai_functions.prompt_compaction import PromptSummary
 
 class AISuggester:
-    def __init__(self, api_key: str, logger):
+    def __init__(self, api_key: str, logger, token_budget: int = 800):
         self.api_key = api_key
         self.logger = logger
+        self.token_budget = token_budget
         openai.api_key = api_key
     
     def get_suggestions(self, files: List[Dict], dest_dir: str) -> List[str]:
@@ -13,11 +15,8 @@ class AISuggester:
             return ["AI suggestions disabled - no API key configured"]
         
         try:
-            # Prepare file information for AI
-            file_info = "\n".join([
-                f"{file['name']} (Type: {file['type']}, Size: {file['size']} bytes)"
-                for file in files
-            ])
+            # Summarize the file set within a fixed token budget
+            file_info = PromptSummary(files, self.token_budget).text
             
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
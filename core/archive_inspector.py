@@ -0,0 +1,116 @@
+import os
+import logging
+import tarfile
+import zipfile
+import mimetypes
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import PurePosixPath
+from typing import List, Dict, Optional
+
+# Batches smaller than this are not worth starting worker processes for
+_MIN_POOL_BATCH = 16
+
+# Share of members the dominant content type needs, else the archive is "mixed"
+DOMINANT_SHARE = 0.5
+
+
+def _member_category(name: str, extension_map: Dict[str, str]) -> str:
+    extension = PurePosixPath(name).suffix.lower()
+    if extension in extension_map:
+        return extension_map[extension]
+    mime_type, _ = mimetypes.guess_type(name)
+    major = (mime_type or '').split('/')[0]
+    if major in ('image', 'video', 'audio', 'text'):
+        return major + 's'
+    return 'others'
+
+
+def _list_members(path: str):
+    """
+    Yield (name, uncompressed size) for every regular file in a zip or uncompressed tar
+    Only the zip central directory or the tar headers are read
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, info.file_size
+        return
+    # 'r:' refuses compressed tars, whose headers cannot be reached without decompressing
+    with tarfile.open(path, mode='r:') as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, member.size
+
+
+def inspect_archive(path: str, extension_map: Dict[str, str]) -> Dict:
+    """
+    Summarize an archive's contents from its metadata, without reading member data
+    extension_map maps extensions to categories (e.g. ".jpg" -> "images")
+    """
+    summary = {"members": 0, "uncompressed_size": 0, "content": None}
+    try:
+        kinds = Counter()
+        for name, size in _list_members(path):
+            kinds[_member_category(name, extension_map)] += 1
+            summary["members"] += 1
+            summary["uncompressed_size"] += size
+        if kinds:
+            kind, count = kinds.most_common(1)[0]
+            summary["content"] = kind if count >= DOMINANT_SHARE * summary["members"] else "mixed"
+    except Exception as e:
+        summary["error"] = str(e)
+    return summary
+
+
+class ArchiveInspector:
+    def __init__(self, logger: logging.Logger, file_types: Dict[str, List[str]], workers: Optional[int] = None):
+        """
+        Inspect many archives' listings using a process pool
+        Member types are judged with the same file_types mapping as the organizer
+        """
+        self.logger = logger
+        self.workers = workers or os.cpu_count() or 1
+        self.extension_map = {
+            ext.lower(): category
+            for category, extensions in file_types.items()
+            for ext in extensions
+        }
+
+    def inspect(self, files: List[Dict]) -> int:
+        """
+        Add archive_members, archive_size and archive_content fields to each file dict
+        Returns the number of archives whose listing could be read
+        """
+        paths = [f['path'] for f in files]
+        inspect = partial(inspect_archive, extension_map=self.extension_map)
+        if len(paths) < _MIN_POOL_BATCH or self.workers == 1:
+            summaries = [inspect(p) for p in paths]
+        else:
+            chunksize = max(1, len(paths) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                summaries = list(pool.map(inspect, paths, chunksize=chunksize))
+
+        inspected = 0
+        for file, summary in zip(files, summaries):
+            if "error" in summary:
+                self.logger.debug(f"Could not list archive {file['path']}: {summary['error']}")
+                continue
+            file["archive_members"] = summary["members"]
+            file["archive_size"] = summary["uncompressed_size"]
+            file["archive_content"] = summary["content"]
+            inspected += 1
+        return inspected
+
+    @staticmethod
+    def target_folder(file: Dict, template: str, category: str) -> str:
+        """
+        Render an archive folder template such as "{category}/{content}"
+        Archives that could not be listed or are empty keep the plain category
+        """
+        content = file.get('archive_content')
+        if not content:
+            return category
+        return template.format(category=category, content=content)
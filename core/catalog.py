@@ -0,0 +1,166 @@
+import re
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Columns of the catalog table, in insert order
+COLUMNS = (
+    "original_path", "new_path", "name", "category", "size",
+    "mime", "modified", "created", "organized_at", "operation",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    original_path TEXT NOT NULL,
+    new_path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    category TEXT,
+    size INTEGER,
+    mime TEXT,
+    modified REAL,
+    created REAL,
+    organized_at REAL,
+    operation TEXT
+);
+CREATE INDEX IF NOT EXISTS files_original_path ON files(original_path);
+CREATE INDEX IF NOT EXISTS files_category ON files(category);
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    name, category, new_path, original_path,
+    content='files', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, name, category, new_path, original_path)
+    VALUES (new.id, new.name, new.category, new.new_path, new.original_path);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, name, category, new_path, original_path)
+    VALUES ('delete', old.id, old.name, old.category, old.new_path, old.original_path);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, name, category, new_path, original_path)
+    VALUES ('delete', old.id, old.name, old.category, old.new_path, old.original_path);
+    INSERT INTO files_fts(rowid, name, category, new_path, original_path)
+    VALUES (new.id, new.name, new.category, new.new_path, new.original_path);
+END;
+"""
+
+_UPSERT = (
+    f"INSERT INTO files ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    "ON CONFLICT(new_path) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in COLUMNS if col != "new_path")
+)
+
+_TERMS = re.compile(r'\w+', re.UNICODE)
+
+
+def default_catalog_path() -> str:
+    return str(Path.home() / ".aifileorganizer" / "catalog.db")
+
+
+def entry_for(file: Dict, new_path: str, target_folder: str, operation: str) -> Dict:
+    """
+    Build a catalog entry for a file dict from scan_directory that was just organized
+    The category is the top-level folder of the target
+    """
+    parts = Path(target_folder).parts
+    return {
+        "original_path": file.get('path', ''),
+        "new_path": new_path,
+        "name": file.get('name', Path(new_path).name),
+        "category": parts[0] if parts else "",
+        "size": file.get('size'),
+        "mime": file.get('type'),
+        "modified": file.get('modified'),
+        "created": file.get('created'),
+        "organized_at": time.time(),
+        "operation": operation,
+    }
+
+
+class FileCatalog:
+    def __init__(self, db_path: str, logger: logging.Logger):
+        """
+        Persistent SQLite catalog of organized files with a full-text index
+        over names, categories and paths
+        One connection is shared by all threads and serialized with a lock
+        """
+        self.db_path = db_path
+        self.logger = logger
+        self._lock = threading.Lock()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record(self, entries: List[Dict]) -> int:
+        """
+        Insert or update a batch of entries in a single transaction
+        Re-organizing to the same new path replaces the earlier entry
+        Returns the number of entries written
+        """
+        if not entries:
+            return 0
+        rows = [tuple(entry.get(col) for col in COLUMNS) for entry in entries]
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(_UPSERT, rows)
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to update catalog {self.db_path}: {e}")
+                return 0
+        return len(rows)
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Full-text search; every word of the query must prefix-match a word
+        in the name, category or either path
+        Results are newest first; an empty query returns the latest entries
+        """
+        terms = _TERMS.findall(query or "")
+        params: List = []
+        if terms:
+            sql = ("SELECT f.* FROM files_fts JOIN files f ON f.id = files_fts.rowid "
+                   "WHERE files_fts MATCH ?")
+            params.append(" ".join(f'"{term}"*' for term in terms))
+        else:
+            sql = "SELECT f.* FROM files f WHERE 1"
+        if category:
+            sql += " AND f.category = ?"
+            params.append(category)
+        # Newest rowid first lets FTS5 stop at the limit instead of ranking every match
+        sql += " ORDER BY files_fts.rowid DESC" if terms else " ORDER BY f.id DESC"
+        sql += " LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def lookup(self, original_path: str) -> List[Dict]:
+        """
+        Find where a file from the given original path went, newest first
+        """
+        return self._query(
+            "SELECT * FROM files WHERE original_path = ? ORDER BY organized_at DESC",
+            [original_path]
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: List) -> List[Dict]:
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                self.logger.error(f"Catalog query failed: {e}")
+                return []
+        return [dict(row) for row in rows]
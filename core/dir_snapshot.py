@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from core.ignore import IgnoreMatcher
+
+SNAPSHOT_VERSION = 1
+
+# A directory changed within the same timestamp tick as the snapshot would keep its mtime,
+# so directories modified this close to the snapshot are always re-listed on the next run
+_RACY_SECONDS = 2.0
+
+
+class ModifiedEntry:
+    """
+    A directory entry of a modified file, with its (size, whole-second mtime) from the snapshot
+    """
+    __slots__ = ("_entry", "previous")
+
+    def __init__(self, entry: os.DirEntry, previous: Tuple[int, int]):
+        self._entry = entry
+        self.previous = previous
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+
+class DirectorySnapshot:
+    def __init__(self, root: str, dirs: Optional[Dict[str, Dict]] = None,
+                 taken: float = 0.0, settings_key: str = ""):
+        """
+        Per-directory mtimes, entry counts, subdirectories and file sizes/mtimes from one scan
+        Directory keys are paths relative to root with '/' separators ("" is the root)
+        """
+        self.root = root
+        self.dirs = dirs or {}
+        self.taken = taken
+        self.settings_key = settings_key
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DirectorySnapshot"]:
+        """
+        Load a saved snapshot, or None if there is none or it is unreadable
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return cls(data["root"], data["dirs"], data["taken"], data.get("settings_key", ""))
+
+    def save(self, path: str) -> None:
+        """
+        Write the snapshot under a temporary name and rename it into place
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": SNAPSHOT_VERSION,
+                "root": self.root,
+                "taken": self.taken,
+                "settings_key": self.settings_key,
+                "dirs": self.dirs,
+            }, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def forget(self, paths: List[str]) -> None:
+        """
+        Drop files from the snapshot so the next scan reports them as added again
+        (e.g. files that failed to organize)
+        """
+        for path in paths:
+            rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+            rel_dir, _, name = rel.rpartition('/')
+            record = self.dirs.get(rel_dir)
+            if record is not None:
+                record["files"].pop(name, None)
+                # Force a re-list so the dropped file is seen
+                record["mtime"] = -1
+
+    @classmethod
+    def scan(
+        cls,
+        root: str,
+        previous: Optional["DirectorySnapshot"] = None,
+        matcher: Optional[IgnoreMatcher] = None,
+        recursive: bool = False,
+        exclude_dirs: Optional[List[str]] = None,
+        settings_key: str = "",
+        onerror: Optional[Callable[[OSError], None]] = None
+    ) -> Tuple["DirectorySnapshot", Dict]:
+        """
+        Take a new snapshot, re-listing only directories whose mtime changed since previous
+        Unchanged directories are stat'ed but not listed; their files are carried over
+        File content changes that leave the directory mtime alone are not detected
+        A directory that cannot be listed is passed to onerror and keeps its previous record
+        Returns the snapshot and the changes: 'added' and 'modified' (lists of os.DirEntry,
+        modified ones wrapped as ModifiedEntry),
+        'removed' (list of paths), 'dirs_listed' and 'dirs_reused'
+        """
+        if previous is not None and (previous.root != root or previous.settings_key != settings_key):
+            previous = None
+        previous_dirs = previous.dirs if previous is not None else {}
+        reuse_before = previous.taken - _RACY_SECONDS if previous is not None else 0.0
+        excluded = {os.path.normcase(os.path.abspath(d)) for d in (exclude_dirs or [])}
+
+        snapshot = cls(root, {}, time.time(), settings_key)
+        changes = {"added": [], "modified": [], "removed": [], "dirs_listed": 0, "dirs_reused": 0}
+        stack = [("", root)]
+        while stack:
+            rel_dir, directory = stack.pop()
+            try:
+                stat = os.stat(directory)
+            except OSError:
+                continue
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            old = previous_dirs.get(rel_dir)
+
+            if old is not None and old["mtime"] == stat.st_mtime_ns and stat.st_mtime < reuse_before:
+                snapshot.dirs[rel_dir] = old
+                changes["dirs_reused"] += 1
+            else:
+                record = {"mtime": stat.st_mtime_ns, "count": 0, "subdirs": [], "files": {}}
+                old_files = old["files"] if old is not None else {}
+                added, modified = [], []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            record["count"] += 1
+                            rel_path = prefix + entry.name
+                            if entry.is_dir(follow_symlinks=False):
+                                if not recursive or (matcher and matcher.match(rel_path, is_dir=True)):
+                                    continue
+                                if os.path.normcase(os.path.abspath(entry.path)) in excluded:
+                                    continue
+                                record["subdirs"].append(entry.name)
+                            elif entry.is_file():
+                                if matcher and matcher.match(rel_path):
+                                    continue
+                                entry_stat = entry.stat()
+                                record["files"][entry.name] = [entry_stat.st_size, entry_stat.st_mtime_ns]
+                                before = old_files.get(entry.name)
+                                if before is None:
+                                    added.append(entry)
+                                elif before != record["files"][entry.name]:
+                                    modified.append(ModifiedEntry(entry, (before[0], before[1] // 10**9)))
+                except OSError as e:
+                    if onerror is not None:
+                        onerror(e)
+                    if old is None:
+                        continue
+                    # Keep what was known, with an mtime that forces a retry next time
+                    record = dict(old, mtime=-1)
+                else:
+                    changes["added"].extend(added)
+                    changes["modified"].extend(modified)
+                    for name in old_files.keys() - record["files"].keys():
+                        changes["removed"].append(os.path.join(directory, name))
+                    changes["dirs_listed"] += 1
+                snapshot.dirs[rel_dir] = record
+
+            for name in snapshot.dirs[rel_dir]["subdirs"]:
+                stack.append((prefix + name, os.path.join(directory, name)))
+
+        # Files of directories that disappeared (or are now ignored) are removed
+        for rel_dir in previous_dirs.keys() - snapshot.dirs.keys():
+            directory = os.path.join(root, *rel_dir.split('/')) if rel_dir else root
+            changes["removed"].extend(os.path.join(directory, name) for name in previous_dirs[rel_dir]["files"])
+        return snapshot, changes
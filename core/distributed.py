@@ -0,0 +1,332 @@
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from core.file_operations import FileOperations
+
+_JOB_FILE = "job.json"
+_CHUNKS_DIR = "chunks"
+_CHUNK_SUFFIX = ".json"
+_LEASE_SUFFIX = ".lease"
+_DONE_SUFFIX = ".done"
+
+
+def _write_json_atomic(path: Path, data: Dict) -> None:
+    """
+    Write JSON under a temporary name and rename it into place,
+    so readers on other hosts never see a partial file
+    """
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class JobQueue:
+    def __init__(self, queue_dir: str, logger: logging.Logger, lease_seconds: float = 300):
+        """
+        Work queue kept in a (possibly shared) directory
+        Workers claim chunks with exclusive lease files that expire if not renewed
+        Leases are numbered: an expired lease n is taken over by exclusively creating
+        lease n + 1, so exactly one worker wins and the old holder can tell it lost
+        """
+        self.queue_dir = Path(queue_dir)
+        self.logger = logger
+        self.lease_seconds = lease_seconds
+        self._held: Dict[Path, int] = {}
+
+    def submit(
+        self,
+        files: List[Dict],
+        targets: List[str],
+        dest_dir: str,
+        keep_originals: bool = False,
+        chunk_size: int = 500
+    ) -> str:
+        """
+        Split planned operations into chunk files for workers to claim
+        Returns the job id
+        """
+        job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+        chunks_dir = self.queue_dir / job_id / _CHUNKS_DIR
+        chunks_dir.mkdir(parents=True)
+
+        # Device ids are only meaningful on this host; workers elsewhere would take
+        # the cross-device copy path for same-filesystem moves
+        files = [{key: value for key, value in file.items() if key != 'device'} for file in files]
+
+        chunk_count = 0
+        for start in range(0, len(files), chunk_size):
+            chunk_count += 1
+            _write_json_atomic(chunks_dir / f"chunk_{chunk_count:06d}{_CHUNK_SUFFIX}", {
+                "files": files[start:start + chunk_size],
+                "targets": targets[start:start + chunk_size],
+            })
+
+        # The manifest is written last: a job is only visible to workers once complete
+        _write_json_atomic(self.queue_dir / job_id / _JOB_FILE, {
+            "job_id": job_id,
+            "dest_dir": dest_dir,
+            "keep_originals": keep_originals,
+            "total_files": len(files),
+            "chunks": chunk_count,
+            "submitted": time.time(),
+        })
+        self.logger.info(f"Submitted job {job_id}: {len(files)} files in {chunk_count} chunks")
+        return job_id
+
+    def jobs(self) -> List[Dict]:
+        """
+        List the manifests of all submitted jobs
+        """
+        manifests = []
+        if not self.queue_dir.exists():
+            return manifests
+        for job_dir in sorted(self.queue_dir.iterdir()):
+            try:
+                with open(job_dir / _JOB_FILE, 'r') as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return manifests
+
+    def status(self, job_id: str) -> Dict:
+        """
+        Summarize chunk states and aggregate results of finished chunks
+        """
+        chunks_dir = self.queue_dir / job_id / _CHUNKS_DIR
+        status = {"job_id": job_id, "chunks": 0, "done": 0, "leased": 0, "pending": 0,
+                  "organized": 0, "failures": 0, "workers": []}
+        for chunk in sorted(chunks_dir.glob(f"*{_CHUNK_SUFFIX}")):
+            status["chunks"] += 1
+            done_path = chunk.with_suffix(_DONE_SUFFIX)
+            if done_path.exists():
+                status["done"] += 1
+                try:
+                    with open(done_path, 'r') as f:
+                        result = json.load(f)
+                    status["organized"] += result.get("organized", 0)
+                    status["failures"] += result.get("failures", 0)
+                    if result.get("worker") not in status["workers"]:
+                        status["workers"].append(result.get("worker"))
+                except (OSError, ValueError):
+                    pass
+            elif self._lease_is_live(self._current_lease(chunk)[1]):
+                status["leased"] += 1
+            else:
+                status["pending"] += 1
+        status["complete"] = status["chunks"] > 0 and status["done"] == status["chunks"]
+        return status
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, Path]]:
+        """
+        Claim the next available chunk of any job
+        Returns (job_id, chunk_path), or None when nothing is claimable
+        """
+        for manifest in self.jobs():
+            chunks_dir = self.queue_dir / manifest["job_id"] / _CHUNKS_DIR
+            for chunk in sorted(chunks_dir.glob(f"*{_CHUNK_SUFFIX}")):
+                if chunk.with_suffix(_DONE_SUFFIX).exists():
+                    continue
+                if self._acquire_lease(chunk, worker_id):
+                    # Another worker may have completed the chunk since the check above
+                    if chunk.with_suffix(_DONE_SUFFIX).exists():
+                        self._release_lease(chunk)
+                        continue
+                    return manifest["job_id"], chunk
+        return None
+
+    def renew(self, chunk: Path) -> bool:
+        """
+        Extend this worker's lease on a chunk that is still being worked on
+        Returns False if the lease was lost: taken over by another worker or the chunk is done
+        """
+        generation = self._held.get(chunk)
+        if generation is None:
+            return False
+        if self._lease_path(chunk, generation + 1).exists() or chunk.with_suffix(_DONE_SUFFIX).exists():
+            self.logger.warning(f"Lease for {chunk.name} was taken over")
+            return False
+        try:
+            os.utime(self._lease_path(chunk, generation))
+        except OSError as e:
+            self.logger.warning(f"Could not renew lease for {chunk.name}: {e}")
+            return False
+        return True
+
+    def complete(self, chunk: Path, result: Dict) -> None:
+        """
+        Record a chunk's results and release its lease
+        """
+        _write_json_atomic(chunk.with_suffix(_DONE_SUFFIX), result)
+        self._release_lease(chunk)
+
+    def _lease_path(self, chunk: Path, generation: int) -> Path:
+        return chunk.with_name(f"{chunk.stem}{_LEASE_SUFFIX}.{generation}")
+
+    def _current_lease(self, chunk: Path) -> Tuple[int, Path]:
+        """
+        Find the newest lease of a chunk by probing generations 1, 2, ...
+        Returns (generation, path), with generation 0 if the chunk was never leased
+        """
+        generation = 0
+        while self._lease_path(chunk, generation + 1).exists():
+            generation += 1
+        return generation, self._lease_path(chunk, generation)
+
+    def _release_lease(self, chunk: Path) -> None:
+        """
+        Remove all lease generations; only safe once the chunk's .done file exists
+        """
+        self._held.pop(chunk, None)
+        generation, _ = self._current_lease(chunk)
+        for n in range(1, generation + 1):
+            try:
+                os.unlink(self._lease_path(chunk, n))
+            except FileNotFoundError:
+                pass
+
+    def _lease_is_live(self, lease: Path) -> bool:
+        try:
+            return time.time() - lease.stat().st_mtime < self.lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def _acquire_lease(self, chunk: Path, worker_id: str) -> bool:
+        """
+        Create the next lease generation exclusively if the chunk has no live lease
+        Expired generations are left in place so no worker can mistake a chunk for unleased
+        """
+        generation, lease = self._current_lease(chunk)
+        if generation and self._lease_is_live(lease):
+            return False
+        try:
+            fd = os.open(self._lease_path(chunk, generation + 1), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"worker": worker_id, "claimed": time.time()}, f)
+        if generation:
+            self.logger.warning(f"Took over expired lease {lease.name}")
+        self._held[chunk] = generation + 1
+        return True
+
+
+class QueueWorker:
+    def __init__(self, queue: JobQueue, config: Dict, logger: logging.Logger,
+                 worker_id: Optional[str] = None):
+        """
+        Claim chunks from a job queue and execute them through FileOperations
+        """
+        self.queue = queue
+        self.config = config
+        self.logger = logger
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.file_ops = FileOperations(logger)
+
+    def run(self, wait: bool = False, poll_interval: float = 2.0) -> Dict:
+        """
+        Process chunks until none are left
+        With wait=True, keep polling for new work instead of returning
+        Returns totals for the chunks this worker processed
+        """
+        totals = {"chunks": 0, "organized": 0, "failures": 0}
+        while True:
+            claimed = self.queue.claim(self.worker_id)
+            if claimed is None:
+                if not wait:
+                    return totals
+                time.sleep(poll_interval)
+                continue
+
+            job_id, chunk = claimed
+            result = self.process_chunk(job_id, chunk)
+            totals["chunks"] += 1
+            totals["organized"] += result["organized"]
+            totals["failures"] += result["failures"]
+
+    def process_chunk(self, job_id: str, chunk: Path) -> Dict:
+        """
+        Execute one claimed chunk while a background thread renews the lease
+        If the lease is lost, the remaining files are left to the worker that took it over
+        """
+        with open(self.queue.queue_dir / job_id / _JOB_FILE, 'r') as f:
+            manifest = json.load(f)
+        with open(chunk, 'r') as f:
+            data = json.load(f)
+
+        files, targets = data["files"], data["targets"]
+        result = {"worker": self.worker_id, "organized": 0, "failures": 0,
+                  "copy_strategies": {}, "started": time.time()}
+        stop, lost = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(
+            target=self._keep_lease, args=(chunk, stop, lost), name=f"lease-{chunk.stem}", daemon=True
+        )
+        heartbeat.start()
+        batch = 50
+        try:
+            for start in range(0, len(files), batch):
+                if lost.is_set():
+                    break
+                organized, failures = self.file_ops.execute_plan(
+                    files[start:start + batch],
+                    targets[start:start + batch],
+                    self.config,
+                    manifest["dest_dir"],
+                    manifest["keep_originals"],
+                    stats=result
+                )
+                result["organized"] += organized
+                result["failures"] += failures
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        result["finished"] = time.time()
+        if lost.is_set():
+            self.logger.warning(f"Worker {self.worker_id} lost the lease on {chunk.name} of job {job_id}")
+            return result
+        self.queue.complete(chunk, result)
+        self.logger.info(
+            f"Worker {self.worker_id} finished {chunk.name} of job {job_id}: "
+            f"{result['organized']} organized, {result['failures']} failed"
+        )
+        return result
+
+    def _keep_lease(self, chunk: Path, stop: threading.Event, lost: threading.Event) -> None:
+        """
+        Renew the lease every third of its lifetime, however long individual files take
+        """
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(chunk):
+                lost.set()
+                return
+
+
+def worker_main(queue_dir: str, wait: bool = False) -> Dict:
+    """
+    Entry point for a worker process using the user's config and log
+    """
+    from utils.config import load_config
+    from utils.logger import setup_logger
+
+    config = load_config()
+    logger = setup_logger(config)
+    lease_seconds = config.get('distributed', {}).get('lease_seconds', 300)
+    worker = QueueWorker(JobQueue(queue_dir, logger, lease_seconds), config, logger)
+    return worker.run(wait=wait)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a file organizer queue worker")
+    parser.add_argument("queue_dir", help="Shared job queue directory")
+    parser.add_argument("--wait", action="store_true", help="Keep polling for new jobs")
+    args = parser.parse_args()
+    print(json.dumps(worker_main(args.queue_dir, args.wait)))
@@ -0,0 +1,272 @@
+import os
+import uuid
+import errno
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Chunk size for kernel-side copies; large chunks keep syscall overhead negligible
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Buffer size for the userspace fallback copy
+FALLBACK_BUFFER_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+# Strategies available for keep_originals, besides a plain "copy"
+COPY_STRATEGIES = ("copy", "reflink", "hardlink", "symlink")
+
+# Verification modes for copies: check size only, or re-read and hash the destination
+VERIFY_MODES = ("off", "size", "reread")
+
+# Errors meaning "this copy mechanism is unsupported here", not "the copy failed"
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+    getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP), errno.EBADF,
+}
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int, chunk_size: int) -> int:
+    """
+    Copy using copy_file_range, which may be offloaded to the filesystem
+    Returns the number of bytes copied
+    """
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(src_fd, dst_fd, min(chunk_size, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int, chunk_size: int) -> int:
+    """
+    Copy using sendfile, keeping the data in the kernel
+    Returns the number of bytes copied
+    """
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(dst_fd, src_fd, copied, min(chunk_size, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def copy_data(src: str, dst: str, chunk_size: int = COPY_CHUNK_SIZE) -> str:
+    """
+    Copy file contents using the fastest available kernel mechanism
+    Falls back from copy_file_range to sendfile to a buffered userspace copy
+    Returns the name of the mechanism that was used
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        for name, func in (("copy_file_range", getattr(os, 'copy_file_range', None)),
+                           ("sendfile", getattr(os, 'sendfile', None))):
+            if func is None or size == 0:
+                continue
+            kernel_copy = _copy_file_range if name == "copy_file_range" else _sendfile
+            try:
+                copied = kernel_copy(fsrc.fileno(), fdst.fileno(), size, chunk_size)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                copied = 0
+            if copied == size:
+                return name
+            # Partial or unsupported copy: restart from scratch with the next method
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst, FALLBACK_BUFFER_SIZE)
+        return "userspace"
+
+
+def copy_file(src: str, dst: str, chunk_size: int = COPY_CHUNK_SIZE) -> str:
+    """
+    Copy a file with its metadata, like shutil.copy2 but using kernel-side copying
+    Returns the name of the mechanism that was used
+    """
+    method = copy_data(src, dst, chunk_size)
+    shutil.copystat(src, dst)
+    return method
+
+
+def _hash_file(path: str, algorithm: str, buffer_size: int = FALLBACK_BUFFER_SIZE) -> str:
+    """
+    Hash a file's contents, asking the OS to drop cached pages first where supported
+    so the data is read back from storage rather than from memory
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        for chunk in iter(lambda: f.read(buffer_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file_verified(src: str, dst: str, mode: str = "size", algorithm: str = "sha256") -> Dict:
+    """
+    Copy a file while hashing the source in the same pass, then check the destination
+    "size" compares sizes, "reread" also re-reads and hashes the destination
+    The source is read exactly once either way
+    Returns a dict with 'hash', 'size' and 'verified'
+    """
+    if mode not in VERIFY_MODES or mode == "off":
+        raise ValueError(f"Unknown verification mode: {mode}")
+
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(FALLBACK_BUFFER_SIZE)
+    view = memoryview(buffer)
+    copied = 0
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb') as fdst:
+        while True:
+            read = fsrc.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+            fdst.write(view[:read])
+            copied += read
+        fdst.flush()
+        if mode == "reread":
+            # Make sure the data reaches storage before it is read back
+            os.fsync(fdst.fileno())
+    shutil.copystat(src, dst)
+
+    source_hash = digest.hexdigest()
+    verified = os.stat(dst).st_size == copied
+    if verified and mode == "reread":
+        verified = _hash_file(dst, algorithm) == source_hash
+    return {"hash": source_hash, "size": copied, "verified": verified}
+
+
+def reserve_destination(
+    dst: str,
+    is_same_source: Optional[Callable[[str], bool]] = None,
+    taken: Optional[Set[str]] = None
+) -> str:
+    """
+    Claim a destination name by creating an empty placeholder there
+    If dst holds another file, "name (1).ext", "name (2).ext", ... are tried instead,
+    so files with the same name from different folders never overwrite each other
+    A name already holding this source's earlier copy (is_same_source(path) is True)
+    is reused, so repeated runs replace their copies instead of adding new ones;
+    names reserved earlier in the same run (collected in taken) are never reused
+    Returns the reserved path, which the caller then replaces with the real file
+    """
+    path = Path(dst)
+    candidate = dst
+    n = 0
+    while True:
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            if taken is not None:
+                taken.add(candidate)
+            return candidate
+        except FileExistsError:
+            reusable = (
+                is_same_source is not None
+                and (taken is None or candidate not in taken)
+                and is_same_source(candidate)
+            )
+            if reusable:
+                # Removed rather than written through: it may be a link to the source itself
+                try:
+                    os.unlink(candidate)
+                except FileNotFoundError:
+                    pass
+                continue
+            n += 1
+            candidate = str(path.with_name(f"{path.stem} ({n}){path.suffix}"))
+
+
+def _link_over(make_link, dst: str) -> None:
+    """
+    Create a link under a temporary name and rename it onto dst, so a reserved
+    placeholder at dst is replaced rather than making the link fail
+    """
+    tmp = f"{dst}.{uuid.uuid4().hex}.tmp"
+    make_link(tmp)
+    try:
+        os.replace(tmp, dst)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def reflink_file(src: str, dst: str) -> None:
+    """
+    Clone a file copy-on-write so no data blocks are duplicated
+    Raises OSError when the platform or filesystem does not support it,
+    leaving dst empty so the caller can fall back to copying into it
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def clone_file(src: str, dst: str, strategy: str = "copy") -> str:
+    """
+    Produce a "copy" of a file using the requested strategy
+    Falls back to a real copy when the strategy is not possible here
+    Returns the strategy that was actually used
+    """
+    if strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Unknown copy strategy: {strategy}")
+
+    try:
+        if strategy == "reflink":
+            reflink_file(src, dst)
+            return "reflink"
+        if strategy == "hardlink":
+            _link_over(lambda tmp: os.link(src, tmp), dst)
+            return "hardlink"
+        if strategy == "symlink":
+            _link_over(lambda tmp: os.symlink(os.path.abspath(src), tmp), dst)
+            return "symlink"
+    except (OSError, NotImplementedError):
+        pass
+
+    copy_file(src, dst)
+    return "copy"
+
+
+def move_file(src: str, dst: str, src_dev: Optional[int] = None, dst_dev: Optional[int] = None) -> str:
+    """
+    Move a file, renaming directly when source and destination share a filesystem
+    Cross-device moves copy with kernel-side copying and then remove the source
+    Returns "rename" or the copy mechanism that was used
+    """
+    same_device = src_dev is None or dst_dev is None or src_dev == dst_dev
+    if same_device:
+        try:
+            # replace, unlike rename on Windows, takes over a reserved placeholder
+            os.replace(src, dst)
+            return "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+    try:
+        method = copy_file(src, dst)
+    except BaseException:
+        # Never leave a partial destination behind
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        raise
+    os.unlink(src)
+    return method
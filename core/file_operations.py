@@ -1,11 +1,23 @@
 import os
-import shutil
 import mimetypes
 import magic
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Set, Union
 import pandas as pd
+import json
 import logging
+import threading
+import time
+from core import metrics
+from core.file_signatures import sniff_mime, read_header
+from core.rules import RuleEngine
+from core.fast_copy import clone_file, move_file, copy_file_verified, reserve_destination
+from core.inventory import ScanInventory
+from core.throttle import IOThrottle, order_operations, ORDER_POLICIES
+from core.ignore import IgnoreMatcher, walk_files
+from core.catalog import FileCatalog, default_catalog_path, entry_for
+from core.sharding import ShardTracker
+from core.dir_snapshot import DirectorySnapshot
 
 class FileOperations:
     def __init__(self, logger: logging.Logger):
@@ -14,6 +26,17 @@ class FileOperations:
         """
         self.logger = logger
         mimetypes.init()
+        self._rule_engine = None
+        self._rule_engine_key = None
+        self._throttle = None
+        self._throttle_key = None
+        self._throttle_lock = threading.Lock()
+        self._catalog = None
+        self._sharder = None
+        self._sharder_key = None
+        self._sharder_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        self._reported_settings: Set[str] = set()
         
         # Try to initialize both magic and mimetypes as fallback
         self.mime_detector = None
@@ -27,9 +50,13 @@ class FileOperations:
 
     def get_file_type(self, file_path: str) -> str:
         """
-        Determine file type using the best available method
+        Determine file type from content using the best available method
+        Tries the built-in signature table on the first bytes before libmagic
         """
         try:
+            mime_type = sniff_mime(read_header(file_path))
+            if mime_type:
+                return mime_type
             if self.mime_detector:
                 return self.mime_detector.from_file(file_path)
             else:
@@ -39,76 +66,420 @@ class FileOperations:
             self.logger.error(f"Error determining file type for {file_path}: {e}")
             return "unknown"
 
-    def scan_directory(self, directory: str) -> List[Dict]:
+    def resolve_file_type(self, file_path: str, extension: str, known_extensions: Set[str]) -> str:
+        """
+        Lazily determine file type, only reading content when the extension is not enough
+        Files whose extension already maps to a category are typed from the name alone
+        """
+        if extension in known_extensions:
+            mime_type, _ = mimetypes.guess_type(file_path)
+            return mime_type or "application/octet-stream"
+        return self.get_file_type(file_path)
+
+    def scan_directory(
+        self,
+        directory: str,
+        rules: Optional[Dict] = None,
+        exclude_dirs: Optional[List[str]] = None,
+        entries: Optional[List[os.DirEntry]] = None
+    ) -> List[Dict]:
         """
         Scan a directory and return comprehensive file information
+        When rules are given, content sniffing is skipped for already-categorized extensions
+        and ignore patterns are applied while traversing
+        Pre-selected entries (e.g. the changes found by scan_changes) are described instead of traversing
         Returns list of dictionaries with file metadata
         """
         files = []
+        known_extensions = self.known_extensions(rules)
         try:
-            for entry in os.scandir(directory):
-                if entry.is_file():
-                    try:
-                        file_type = self.get_file_type(entry.path)
-                        files.append({
-                            "name": entry.name,
-                            "path": entry.path,
-                            "size": entry.stat().st_size,
-                            "modified": entry.stat().st_mtime,
-                            "created": entry.stat().st_ctime,
-                            "type": file_type,
-                            "extension": Path(entry.name).suffix.lower()
-                        })
-                    except Exception as e:
-                        self.logger.error(f"Error processing file {entry.path}: {e}")
+            if entries is None:
+                entries = self.iter_entries(directory, rules, exclude_dirs)
+            for entry in entries:
+                try:
+                    files.append(self.describe_entry(entry, known_extensions))
+                except Exception as e:
+                    self.logger.error(f"Error processing file {entry.path}: {e}")
             return files
         except Exception as e:
             self.logger.error(f"Error scanning directory {directory}: {e}")
             return []
 
+    def scan_changes(
+        self,
+        directory: str,
+        rules: Optional[Dict] = None,
+        previous: Optional[DirectorySnapshot] = None,
+        exclude_dirs: Optional[List[str]] = None
+    ):
+        """
+        Snapshot the directory tree, listing only directories changed since the previous snapshot
+        Ignore settings are part of the snapshot: when they change, everything is re-listed
+        Returns (snapshot, changes) as DirectorySnapshot.scan does
+        """
+        settings = (rules or {}).get('ignore', {})
+        matcher = IgnoreMatcher.for_directory(
+            directory,
+            settings.get('patterns', []),
+            settings.get('file', ''),
+            self.logger
+        )
+        settings_key = json.dumps(
+            [settings, sorted(os.path.abspath(d) for d in (exclude_dirs or []))],
+            sort_keys=True,
+            default=str
+        )
+        return DirectorySnapshot.scan(
+            directory,
+            previous,
+            matcher,
+            settings.get('recursive', False),
+            exclude_dirs,
+            settings_key,
+            lambda e: self.logger.error(f"Skipping unreadable directory {e.filename}: {e}")
+        )
+
+    def iter_entries(
+        self,
+        directory: str,
+        rules: Optional[Dict] = None,
+        exclude_dirs: Optional[List[str]] = None
+    ):
+        """
+        Yield the file entries to organize, skipping ignored paths
+        Ignored directories (and exclude_dirs, e.g. a destination inside the source) are pruned
+        """
+        settings = (rules or {}).get('ignore', {})
+        matcher = IgnoreMatcher.for_directory(
+            directory,
+            settings.get('patterns', []),
+            settings.get('file', ''),
+            self.logger
+        )
+        return walk_files(
+            directory,
+            matcher,
+            settings.get('recursive', False),
+            exclude_dirs,
+            lambda e: self.logger.error(f"Skipping unreadable directory {e.filename}: {e}")
+        )
+
+    def describe_entry(self, entry: os.DirEntry, known_extensions: Set[str]) -> Dict:
+        """
+        Build the file metadata dictionary for one directory entry
+        """
+        extension = Path(entry.name).suffix.lower()
+        file_type = self.resolve_file_type(entry.path, extension, known_extensions)
+        stat = entry.stat()
+        file = {
+            "name": entry.name,
+            "path": entry.path,
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+            "created": stat.st_ctime,
+            "device": stat.st_dev,
+            "type": file_type,
+            "extension": extension
+        }
+        # Entries of modified files from a snapshot scan know their earlier (size, mtime)
+        if getattr(entry, 'previous', None):
+            file["previous"] = entry.previous
+        return file
+
+    def known_extensions(self, rules: Optional[Dict]) -> Set[str]:
+        """
+        Collect every extension that maps to a category in the rules
+        """
+        if not rules:
+            return set()
+        return {
+            ext.lower()
+            for extensions in rules.get('file_types', {}).values()
+            for ext in extensions
+        }
+
     def organize_files(
         self, 
         files: List[Dict], 
         rules: Dict, 
         dest_dir: str, 
-        keep_originals: bool = False
+        keep_originals: bool = False,
+        stats: Optional[Dict] = None
     ) -> Tuple[int, int]:
         """
         Organize files based on rules with option to keep originals
+        Copies use rules['behavior']['copy_strategy'] (copy, reflink, hardlink or symlink)
+        If a stats dict is given, per-strategy counts are added under 'copy_strategies'
+        Returns tuple of (success_count, failure_count)
+        """
+        targets = self.plan_targets(files, rules)
+        return self.execute_plan(files, targets, rules, dest_dir, keep_originals, stats)
+
+    def execute_plan(
+        self,
+        files: List[Dict],
+        targets: List[str],
+        rules: Dict,
+        dest_dir: str,
+        keep_originals: bool = False,
+        stats: Optional[Dict] = None
+    ) -> Tuple[int, int]:
+        """
+        Move or copy each file into its already planned target folder
+        Files are processed in rules['behavior']['order'] order and rate limited
+        by rules['throttle'], shared by every caller of this instance
+        When rules['catalog'] is enabled, organized files are recorded in batches
+        When rules['sharding'] is enabled, full target folders are split into subfolders
+        Other files are never overwritten; a clashing name gets a " (n)" suffix,
+        while an earlier run's copy of the same source is replaced
+        If a stats dict is given, paths of files that failed are added under 'failed_paths'
         Returns tuple of (success_count, failure_count)
         """
         success = 0
         failures = 0
+        behavior = rules.get('behavior', {})
+        strategy = behavior.get('copy_strategy', 'copy')
+        verify_mode = behavior.get('verify_copies', 'off')
+        hash_algorithm = behavior.get('hash_algorithm', 'sha256')
+        strategy_counts = stats.setdefault('copy_strategies', {}) if stats is not None else {}
+        verifications = stats.setdefault('verified_copies', []) if stats is not None else []
+        failed_paths = stats.setdefault('failed_paths', []) if stats is not None else []
+        target_devices = {}
+        throttle = self._get_throttle(rules)
+        throttle_wait = 0.0
+        files, targets = order_operations(files, targets, self._order_policy(behavior))
+        catalog = self.get_catalog(rules)
+        catalog_batch = max(1, rules.get('catalog', {}).get('batch_size', 500))
+        catalog_entries = []
+        sharder = self._get_sharder(rules)
+        reserved: Set[str] = set()
         
-        for file in files:
+        for file, target_folder in zip(files, targets):
             try:
-                # Determine target folder based on rules
-                target_folder = self._determine_target_folder(file, rules)
+                if sharder is not None:
+                    target_folder = sharder.assign(dest_dir, target_folder, file)
                 
-                # Create target directory if needed
+                # Create target directory once and remember which device it lives on
                 target_path = Path(dest_dir) / target_folder
-                target_path.mkdir(parents=True, exist_ok=True)
+                if target_path not in target_devices:
+                    target_path.mkdir(parents=True, exist_ok=True)
+                    target_devices[target_path] = os.stat(target_path).st_dev
+                
+                # Same-device moves are renames and transfer no data; links and clones
+                # are charged once done, by the method used, as they may fall back to copying
+                charge_after = keep_originals and strategy != 'copy'
+                if throttle.enabled and not charge_after:
+                    same_device = not keep_originals and file.get('device') == target_devices[target_path]
+                    throttle_wait += throttle.acquire(0 if same_device else file.get('size', 0))
+                
+                # Same names from different source folders must not replace each other
+                started = time.perf_counter()
+                dest = reserve_destination(
+                    str(target_path / file['name']), self._earlier_copy_check(file), reserved
+                )
                 
                 # Perform file operation based on keep_originals setting
-                if keep_originals:
-                    shutil.copy2(file['path'], target_path / file['name'])
-                    action = "Copied"
-                else:
-                    shutil.move(file['path'], target_path / file['name'])
-                    action = "Moved"
+                try:
+                    if keep_originals and strategy == 'copy' and verify_mode != 'off':
+                        method = self._verified_copy(file, Path(dest), verify_mode, hash_algorithm, verifications)
+                        strategy_counts[method] = strategy_counts.get(method, 0) + 1
+                        action = "Copied"
+                    elif keep_originals:
+                        method = clone_file(file['path'], dest, strategy)
+                        strategy_counts[method] = strategy_counts.get(method, 0) + 1
+                        action = "Copied"
+                    else:
+                        method = move_file(file['path'], dest, file.get('device'), target_devices[target_path])
+                        action = "Moved"
+                except BaseException:
+                    # Release the reserved name (and any partial copy under it)
+                    try:
+                        os.unlink(dest)
+                    except OSError:
+                        pass
+                    raise
+                if throttle.enabled and charge_after:
+                    throttle_wait += throttle.acquire(file.get('size', 0) if method == 'copy' else 0)
                 
-                self.logger.debug(f"{action} {file['name']} to {target_folder}")
+                self.logger.debug(f"{action} {file['name']} to {dest} ({method})")
                 success += 1
+                metrics.OPERATION_SECONDS.observe(time.perf_counter() - started, operation=method)
+                metrics.BYTES_ORGANIZED.inc(file.get('size', 0), operation=method)
+                metrics.FILES_ORGANIZED.inc(category=(Path(target_folder).parts or ("",))[0])
+                if catalog is not None:
+                    catalog_entries.append(entry_for(file, dest, target_folder, method))
+                    if len(catalog_entries) >= catalog_batch:
+                        catalog.record(catalog_entries)
+                        catalog_entries = []
             except Exception as e:
                 self.logger.error(f"Failed to organize {file.get('name', 'unknown')}: {e}")
                 failures += 1
+                failed_paths.append(file.get('path'))
+                metrics.FILES_FAILED.inc(category=(Path(target_folder).parts or ("",))[0])
         
+        if catalog is not None:
+            catalog.record(catalog_entries)
+        if stats is not None and throttle_wait:
+            stats['throttle_wait_seconds'] = stats.get('throttle_wait_seconds', 0) + round(throttle_wait, 3)
         return success, failures
 
+    def _verified_copy(self, file: Dict, dest: Path, mode: str, algorithm: str, records: List[Dict]) -> str:
+        """
+        Copy one file with single-pass hashing and record the outcome
+        A destination that fails verification or is left partial by an error
+        is removed and the file counts as failed
+        """
+        record = {"path": file['path'], "dest": str(dest)}
+        try:
+            record.update(copy_file_verified(file['path'], str(dest), mode, algorithm))
+        except Exception as e:
+            record.update({"verified": False, "error": str(e)})
+            records.append(record)
+            self._remove_partial(dest)
+            raise
+        records.append(record)
+        if not record['verified']:
+            self._remove_partial(dest)
+            raise IOError(f"Copy verification failed for {dest}")
+        return "verified_copy"
+
+    @staticmethod
+    def _earlier_copy_check(file: Dict):
+        """
+        Return a check for whether a destination path holds an earlier copy of this file:
+        same size and modification time (copies keep the source's mtime) as the file now,
+        or as it was when last organized if it has since been modified ('previous')
+        """
+        states = {(file.get('size'), int(file.get('modified', 0)))}
+        if file.get('previous'):
+            states.add(tuple(file['previous']))
+        source = os.path.abspath(file['path'])
+
+        def check(candidate: str) -> bool:
+            if os.path.abspath(candidate) == source:
+                return False
+            try:
+                stat = os.stat(candidate)
+            except OSError:
+                return False
+            return (stat.st_size, int(stat.st_mtime)) in states
+        return check
+
+    @staticmethod
+    def _remove_partial(dest: Path) -> None:
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+
+    def _get_throttle(self, rules: Dict) -> IOThrottle:
+        """
+        Return the I/O throttle for the configured limits, shared across threads
+        A new throttle is only created when the limits change
+        """
+        settings = rules.get('throttle', {})
+        key = (settings.get('bytes_per_second', 0), settings.get('ops_per_second', 0))
+        with self._throttle_lock:
+            if key != self._throttle_key:
+                self._throttle = IOThrottle(*key)
+                self._throttle_key = key
+            return self._throttle
+
+    def _order_policy(self, behavior: Dict) -> str:
+        """
+        Return the configured ordering policy, or 'none' (logged once) if it is unknown
+        """
+        policy = behavior.get('order', 'none')
+        if policy in ORDER_POLICIES:
+            return policy
+        self._report_setting(f"Unknown ordering policy {policy!r}, keeping scan order")
+        return 'none'
+
+    def _report_setting(self, message: str) -> None:
+        """
+        Log a configuration problem once instead of for every batch
+        """
+        if message not in self._reported_settings:
+            self._reported_settings.add(message)
+            self.logger.error(message)
+
+    def _get_sharder(self, rules: Dict) -> Optional[ShardTracker]:
+        """
+        Return the shard tracker if sharding is enabled, keeping its counters while settings are unchanged
+        Invalid sharding settings are logged and sharding is left off
+        """
+        settings = rules.get('sharding', {})
+        if not settings.get('enabled', False):
+            return None
+        key = (
+            settings.get('max_entries', 10000),
+            settings.get('mode', 'hash'),
+            settings.get('hash_chars', 2),
+            settings.get('max_depth', 3)
+        )
+        with self._sharder_lock:
+            if key != self._sharder_key:
+                try:
+                    self._sharder = ShardTracker(*key)
+                except (ValueError, TypeError) as e:
+                    self._report_setting(f"Invalid sharding settings, sharding disabled: {e}")
+                    self._sharder = None
+                self._sharder_key = key
+            return self._sharder
+
+    def get_catalog(self, rules: Dict) -> Optional[FileCatalog]:
+        """
+        Return the catalog of organized files if enabled, opening it once per path
+        """
+        settings = rules.get('catalog', {})
+        if not settings.get('enabled', False):
+            return None
+        path = settings.get('path') or default_catalog_path()
+        with self._catalog_lock:
+            if self._catalog is None or self._catalog.db_path != path:
+                try:
+                    self._catalog = FileCatalog(path, self.logger)
+                except Exception as e:
+                    self.logger.error(f"Could not open catalog {path}: {e}")
+                    return None
+            return self._catalog
+
+    def plan_targets(self, files: List[Dict], rules: Dict) -> List[str]:
+        """
+        Determine the target folder for every file in one batch
+        Custom rules from the config are evaluated on top of the category defaults
+        """
+        defaults = [self._determine_target_folder(file, rules) for file in files]
+        engine = self._get_rule_engine(rules)
+        if engine is None:
+            return defaults
+        try:
+            return engine.assign_targets(files, defaults)
+        except Exception as e:
+            self.logger.error(f"Rule evaluation failed, using default categories: {e}")
+            return defaults
+
+    def _get_rule_engine(self, rules: Dict):
+        """
+        Return a rule engine for the config's custom rules, compiling only when they change
+        """
+        custom_rules = rules.get('rules') or []
+        if not custom_rules:
+            return None
+        key = json.dumps(custom_rules, sort_keys=True, default=str)
+        if key != self._rule_engine_key:
+            self._rule_engine = RuleEngine(custom_rules, self.logger)
+            self._rule_engine_key = key
+        return self._rule_engine
+
     def _determine_target_folder(self, file: Dict, rules: Dict) -> str:
         """
         Determine the target folder for a file based on categorization rules
+        A 'category' already assigned to the file (e.g. by a classifier) takes precedence
         """
+        if file.get('category'):
+            return file['category']
+        
         # First try extension-based matching
         file_ext = file.get('extension', '')
         for category, extensions in rules['file_types'].items():
@@ -122,13 +493,13 @@ class FileOperations:
         
         return 'others'
 
-    def generate_report(self, files: List[Dict], output_path: str) -> bool:
+    def generate_report(self, files: Union[List[Dict], ScanInventory], output_path: str) -> bool:
         """
-        Generate a CSV report of file operations
+        Generate a CSV report of file operations from scanned files or a saved inventory
         Returns True if successful
         """
         try:
-            df = pd.DataFrame(files)
+            df = files.to_frame() if isinstance(files, ScanInventory) else pd.DataFrame(files)
             df['size_mb'] = df['size'] / (1024 * 1024)
             
             report_columns = [
@@ -142,6 +513,26 @@ class FileOperations:
             self.logger.error(f"Error generating report: {e}")
             return False
 
+    def remove_empty_dirs(self, root: str, directories) -> int:
+        """
+        Remove the given directories and then their parents while they are empty,
+        without walking the rest of the tree; root itself is kept
+        Returns count of removed directories
+        """
+        root_path = Path(root).resolve()
+        removed = 0
+        # Deepest first, so emptied parents can go too
+        for directory in sorted(directories, key=lambda d: len(Path(d).parts), reverse=True):
+            path = Path(directory).resolve()
+            while path != root_path and root_path in path.parents:
+                try:
+                    path.rmdir()
+                except OSError:
+                    break
+                removed += 1
+                path = path.parent
+        return removed
+
     def cleanup_empty_dirs(self, directory: str) -> int:
         """
         Remove empty directories after organization
@@ -0,0 +1,134 @@
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (offset, magic bytes, mime type) - checked in order, first match wins
+SIGNATURES: List[Tuple[int, bytes, str]] = [
+    # Images
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"\x00\x00\x01\x00", "image/vnd.microsoft.icon"),
+    (8, b"WEBP", "image/webp"),
+    # Documents
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"{\\rtf", "application/rtf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage"),
+    # Archives
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"PK\x05\x06", "application/zip"),
+    (0, b"Rar!\x1a\x07", "application/x-rar"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (0, b"BZh", "application/x-bzip2"),
+    (0, b"\xfd7zXZ\x00", "application/x-xz"),
+    (257, b"ustar", "application/x-tar"),
+    # Audio
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (8, b"WAVE", "audio/x-wav"),
+    # Video
+    (8, b"AVI ", "video/x-msvideo"),
+    (4, b"ftyp", "video/mp4"),  # ISO base media; the major brand decides, see _iso_bmff_type
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska"),
+    # Executables
+    (0, b"\x7fELF", "application/x-executable"),
+    (0, b"MZ", "application/x-dosexec"),
+]
+
+# BITMAPCOREHEADER, BITMAPINFOHEADER and its V2-V5 successors
+_BMP_DIB_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+
+# PE headers usually start within the first few hundred bytes
+_PE_HEADER_LIMIT = 512
+
+
+def _is_bmp(header: bytes) -> bool:
+    """
+    "BM" alone is too common in text; require zero reserved fields and a known DIB header size
+    """
+    if len(header) < 18:
+        return False
+    reserved, = struct.unpack_from("<I", header, 6)
+    dib_size, = struct.unpack_from("<I", header, 14)
+    return reserved == 0 and dib_size in _BMP_DIB_HEADER_SIZES
+
+
+def _is_pe(header: bytes) -> bool:
+    """
+    "MZ" alone is too common in text; require the PE signature at the e_lfanew offset
+    """
+    if len(header) < 64:
+        return False
+    pe_offset, = struct.unpack_from("<I", header, 60)
+    return 64 <= pe_offset and header[pe_offset:pe_offset + 4] == b"PE\x00\x00"
+
+
+# ISO base media major brands (bytes 8-12); HEIC photos and M4A audio share the "ftyp" box with MP4
+_FTYP_BRANDS = {
+    **dict.fromkeys((b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx"), "image/heic"),
+    **dict.fromkeys((b"mif1", b"msf1"), "image/heif"),
+    **dict.fromkeys((b"avif", b"avis"), "image/avif"),
+    **dict.fromkeys((b"M4A ", b"M4B ", b"M4P ", b"F4A ", b"F4B "), "audio/mp4"),
+    **dict.fromkeys((b"qt  ",), "video/quicktime"),
+    **dict.fromkeys((b"3gp4", b"3gp5", b"3gp6", b"3g2a"), "video/3gpp"),
+    **dict.fromkeys((b"isom", b"iso2", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42",
+                     b"avc1", b"dash", b"M4V ", b"MSNV", b"F4V "), "video/mp4"),
+}
+
+
+def _iso_bmff_type(header: bytes) -> Optional[str]:
+    """
+    Mime type for an ISO base media file's major brand; unknown brands are left to libmagic
+    """
+    return _FTYP_BRANDS.get(header[8:12])
+
+
+# Short signatures only count when the header structure behind them checks out too;
+# anything else is left to libmagic
+STRUCTURE_CHECKS: Dict[str, Callable[[bytes], bool]] = {
+    "image/bmp": _is_bmp,
+    "application/x-dosexec": _is_pe,
+}
+
+# Signatures shared by several file types, resolved from the header (None: not recognized)
+REFINEMENTS: Dict[str, Callable[[bytes], Optional[str]]] = {
+    "video/mp4": _iso_bmff_type,
+}
+
+# Number of leading bytes needed to cover every signature and structure check
+SNIFF_SIZE = max(
+    max(offset + len(signature) for offset, signature, _ in SIGNATURES),
+    _PE_HEADER_LIMIT
+)
+
+
+def sniff_mime(header: bytes) -> Optional[str]:
+    """
+    Match the leading bytes of a file against the built-in signature table
+    Returns the mime type, or None if no signature matched
+    """
+    for offset, signature, mime_type in SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            check = STRUCTURE_CHECKS.get(mime_type)
+            if check is not None and not check(header):
+                continue
+            refine = REFINEMENTS.get(mime_type)
+            if refine is not None:
+                mime_type = refine(header)
+                if mime_type is None:
+                    continue
+            return mime_type
+    return None
+
+
+def read_header(file_path: str) -> bytes:
+    """
+    Read just enough leading bytes from a file to cover every signature
+    """
+    with open(file_path, 'rb') as f:
+        return f.read(SNIFF_SIZE)
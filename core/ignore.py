@@ -0,0 +1,184 @@
+import os
+import re
+import logging
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+IGNORE_FILE_NAME = ".organizerignore"
+
+
+def _translate(pattern: str) -> str:
+    """
+    Translate the body of a gitignore pattern into a regular expression
+    """
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == n:
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif c == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif c == '?':
+            parts.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return ''.join(parts)
+
+
+class IgnoreMatcher:
+    def __init__(self, patterns: List[str], logger: Optional[logging.Logger] = None):
+        """
+        Compile gitignore-style patterns once
+        Supports comments, '!' negation, trailing '/' for directories only,
+        anchoring with '/', and '*', '?', '[...]' and '**' wildcards
+        """
+        self.logger = logger
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for raw in patterns:
+            rule = self._compile(raw)
+            if rule is not None:
+                self.rules.append(rule)
+
+        # Without negations, order does not matter: one combined regex per kind is enough
+        self._has_negation = any(negate for _, negate, _ in self.rules)
+        self._any = self._combine([rx for rx, _, dir_only in self.rules if not dir_only])
+        self._dirs = self._combine([rx for rx, _, _ in self.rules])
+
+    @classmethod
+    def for_directory(cls, root: str, patterns: Optional[List[str]] = None,
+                      ignore_file: str = IGNORE_FILE_NAME,
+                      logger: Optional[logging.Logger] = None) -> "IgnoreMatcher":
+        """
+        Build a matcher from config patterns plus the root's ignore file, if present
+        Patterns from the ignore file come last, so they can override the config
+        """
+        combined = list(patterns or [])
+        if ignore_file:
+            try:
+                with open(Path(root) / ignore_file, 'r', encoding='utf-8') as f:
+                    combined.extend(f.read().splitlines())
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                if logger:
+                    logger.error(f"Could not read {ignore_file} in {root}: {e}")
+            # The ignore file itself is never organized
+            combined.append("/" + ignore_file)
+        return cls(combined, logger)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def _compile(self, raw: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+        pattern = raw.rstrip('\n')
+        if not pattern.strip() or pattern.startswith('#'):
+            return None
+        if not pattern.endswith('\\ '):
+            pattern = pattern.rstrip(' ')
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            return None
+
+        anchored = '/' in pattern
+        body = _translate(pattern.lstrip('/'))
+        prefix = '^' if anchored else '^(?:.*/)?'
+        try:
+            return re.compile(f"{prefix}{body}$"), negate, dir_only
+        except re.error as e:
+            if self.logger:
+                self.logger.error(f"Invalid ignore pattern '{raw}': {e}")
+            return None
+
+    @staticmethod
+    def _combine(regexes: List[re.Pattern]) -> Optional[re.Pattern]:
+        if not regexes:
+            return None
+        return re.compile('|'.join(f"(?:{rx.pattern})" for rx in regexes))
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a path relative to the root (with '/' separators) against the rules
+        The last matching rule wins, as in gitignore
+        """
+        if not self.rules:
+            return False
+        if not self._has_negation:
+            combined = self._dirs if is_dir else self._any
+            return bool(combined and combined.match(rel_path))
+
+        ignored = False
+        for rx, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if rx.match(rel_path):
+                ignored = not negate
+        return ignored
+
+
+def walk_files(root: str, matcher: Optional[IgnoreMatcher] = None, recursive: bool = False,
+               exclude_dirs: Optional[List[str]] = None,
+               onerror: Optional[Callable[[OSError], None]] = None) -> Iterator[os.DirEntry]:
+    """
+    Yield file entries under root, skipping ignored files
+    Ignored and excluded directories are pruned and never listed
+    A subdirectory that cannot be listed is skipped and passed to onerror;
+    errors listing root itself are raised
+    """
+    excluded = {os.path.normcase(os.path.abspath(d)) for d in (exclude_dirs or [])}
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            if directory is root:
+                raise
+            if onerror is not None:
+                onerror(e)
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if not recursive:
+                        continue
+                    if matcher and matcher.match(rel_path, is_dir=True):
+                        continue
+                    if os.path.normcase(os.path.abspath(entry.path)) in excluded:
+                        continue
+                    stack.append((entry.path, rel_path + "/"))
+                elif entry.is_file():
+                    if matcher and matcher.match(rel_path):
+                        continue
+                    yield entry
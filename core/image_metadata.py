@@ -0,0 +1,116 @@
+import os
+import re
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional
+from PIL import Image
+
+# EXIF tags
+_TAG_MAKE = 0x010F
+_TAG_MODEL = 0x0110
+_TAG_DATETIME = 0x0132
+_TAG_DATETIME_ORIGINAL = 0x9003
+_EXIF_IFD = 0x8769
+
+# Formats whose getexif() only parses headers; PNG's may decode the whole image
+# to find an eXIf chunk stored after the pixel data
+_LAZY_EXIF_FORMATS = {"JPEG", "MPO", "TIFF", "WEBP"}
+
+# Batches smaller than this are not worth starting worker processes for
+_MIN_POOL_BATCH = 64
+
+_UNSAFE_PATH_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+
+
+def _parse_exif_date(value) -> Optional[float]:
+    """
+    Convert an EXIF "YYYY:MM:DD HH:MM:SS" string to a timestamp
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value).strip('\x00 ')[:19], "%Y:%m:%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+
+def extract_image_metadata(path: str) -> Dict:
+    """
+    Read dimensions, capture date and camera from an image's headers
+    Image.open is lazy, so pixel data is never decoded
+    Other formats only use EXIF found while reading their headers
+    """
+    metadata = {"width": None, "height": None, "taken": None, "camera": None}
+    try:
+        with Image.open(path) as img:
+            metadata["width"], metadata["height"] = img.size
+            if img.format in _LAZY_EXIF_FORMATS:
+                exif = img.getexif()
+            else:
+                exif = Image.Exif()
+                if img.info.get("exif"):
+                    exif.load(img.info["exif"])
+            if exif:
+                exif_ifd = exif.get_ifd(_EXIF_IFD)
+                metadata["taken"] = (
+                    _parse_exif_date(exif_ifd.get(_TAG_DATETIME_ORIGINAL))
+                    or _parse_exif_date(exif.get(_TAG_DATETIME))
+                )
+                make = str(exif.get(_TAG_MAKE, '')).strip('\x00 ')
+                model = str(exif.get(_TAG_MODEL, '')).strip('\x00 ')
+                # Many models already start with the make ("Canon Canon EOS R5")
+                if make and model.lower().startswith(make.lower()):
+                    make = ''
+                camera = f"{make} {model}".strip()
+                metadata["camera"] = camera or None
+    except Exception as e:
+        metadata["error"] = str(e)
+    return metadata
+
+
+class ImageMetadataExtractor:
+    def __init__(self, logger: logging.Logger, workers: Optional[int] = None):
+        """
+        Extract image header metadata for many files using a process pool
+        """
+        self.logger = logger
+        self.workers = workers or os.cpu_count() or 1
+
+    def extract(self, files: List[Dict]) -> int:
+        """
+        Add width, height, taken and camera fields to each file dict
+        Returns the number of files whose headers could be read
+        """
+        paths = [f['path'] for f in files]
+        if len(paths) < _MIN_POOL_BATCH or self.workers == 1:
+            metadata = [extract_image_metadata(p) for p in paths]
+        else:
+            chunksize = max(1, len(paths) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                metadata = list(pool.map(extract_image_metadata, paths, chunksize=chunksize))
+
+        extracted = 0
+        for file, meta in zip(files, metadata):
+            if "error" in meta:
+                self.logger.debug(f"Could not read image metadata for {file['path']}: {meta['error']}")
+                continue
+            file.update(meta)
+            extracted += 1
+        return extracted
+
+    @staticmethod
+    def target_folder(file: Dict, template: str, category: str) -> str:
+        """
+        Render an image folder template such as "{category}/{year}/{camera}"
+        Falls back to the file's modification time when there is no capture date
+        """
+        taken = datetime.fromtimestamp(file.get('taken') or file.get('modified', 0))
+        camera = _UNSAFE_PATH_CHARS.sub('_', file.get('camera') or 'Unknown Camera').strip(' .')
+        return template.format(
+            category=category,
+            year=f"{taken.year:04d}",
+            month=f"{taken.month:02d}",
+            day=f"{taken.day:02d}",
+            camera=camera or 'Unknown Camera',
+        )
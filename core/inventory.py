@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Optional
+
+INVENTORY_VERSION = 1
+
+# One fixed-size record per file; strings live in a separate byte table
+RECORD_DTYPE = np.dtype([
+    ("path_hash", "<u8"),
+    ("path_offset", "<u8"),
+    ("path_length", "<u4"),
+    ("name_start", "<u4"),
+    ("size", "<i8"),
+    ("modified", "<f8"),
+    ("created", "<f8"),
+    ("device", "<u8"),
+    ("type_id", "<i4"),
+    ("extension_id", "<i4"),
+])
+
+_RECORDS_FILE = "records.npy"
+_STRINGS_FILE = "strings.npy"
+_META_FILE = "meta.json"
+
+
+def path_hash(path: str) -> int:
+    """
+    Stable 64-bit hash of a path, used to join inventories without decoding strings
+    """
+    digest = hashlib.blake2b(path.encode('utf-8', 'surrogateescape'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class ScanInventory:
+    def __init__(self, records: np.ndarray, strings: np.ndarray, types: List[str],
+                 extensions: List[str], meta: Optional[Dict] = None):
+        """
+        Columnar scan result: a structured record array plus a string table
+        Loaded inventories are memory-mapped, so only touched pages are read
+        """
+        self.records = records
+        self.strings = strings
+        self.types = types
+        self.extensions = extensions
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def from_files(cls, files: List[Dict], source: str = "") -> "ScanInventory":
+        """
+        Build an inventory from the list of dicts returned by scan_directory
+        """
+        type_ids: Dict[str, int] = {}
+        extension_ids: Dict[str, int] = {}
+        encoded = [f['path'].encode('utf-8', 'surrogateescape') for f in files]
+        lengths = np.fromiter((len(p) for p in encoded), dtype=np.uint64, count=len(files))
+
+        records = np.zeros(len(files), dtype=RECORD_DTYPE)
+        records["path_length"] = lengths
+        records["path_offset"] = np.cumsum(lengths) - lengths
+        records["path_hash"] = [path_hash(f['path']) for f in files]
+        records["name_start"] = [
+            len(p) - len(f['name'].encode('utf-8', 'surrogateescape'))
+            for p, f in zip(encoded, files)
+        ]
+        records["size"] = [f.get('size', 0) for f in files]
+        records["modified"] = [f.get('modified', 0) for f in files]
+        records["created"] = [f.get('created', 0) for f in files]
+        records["device"] = [f.get('device', 0) for f in files]
+        records["type_id"] = [type_ids.setdefault(f.get('type', ''), len(type_ids)) for f in files]
+        records["extension_id"] = [
+            extension_ids.setdefault(f.get('extension', ''), len(extension_ids)) for f in files
+        ]
+
+        strings = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        meta = {"version": INVENTORY_VERSION, "source": source, "created": time.time()}
+        return cls(records, strings, list(type_ids), list(extension_ids), meta)
+
+    def save(self, directory: str) -> None:
+        """
+        Write the inventory to a directory, replacing any previous one
+        Each file is written under a temporary name and swapped in afterwards
+        """
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        meta = dict(self.meta, types=self.types, extensions=self.extensions, count=len(self))
+
+        for name, array in ((_RECORDS_FILE, self.records), (_STRINGS_FILE, self.strings)):
+            tmp = target / f".{name}.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp, target / name)
+        tmp = target / f".{_META_FILE}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, target / _META_FILE)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["ScanInventory"]:
+        """
+        Memory-map a saved inventory
+        Returns None if there is no inventory or it has an unknown version
+        """
+        target = Path(directory)
+        try:
+            with open(target / _META_FILE, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != INVENTORY_VERSION:
+            return None
+
+        records = np.load(target / _RECORDS_FILE, mmap_mode='r')
+        strings = np.load(target / _STRINGS_FILE, mmap_mode='r')
+        types = meta.pop("types", [])
+        extensions = meta.pop("extensions", [])
+        return cls(records, strings, types, extensions, meta)
+
+    def path(self, index: int) -> str:
+        record = self.records[index]
+        start = int(record["path_offset"])
+        raw = self.strings[start:start + int(record["path_length"])].tobytes()
+        return raw.decode('utf-8', 'surrogateescape')
+
+    def file(self, index: int) -> Dict:
+        """
+        Rebuild the scan_directory dict for one entry
+        """
+        record = self.records[index]
+        path = self.path(index)
+        name_start = int(record["name_start"])
+        name = path.encode('utf-8', 'surrogateescape')[name_start:].decode('utf-8', 'surrogateescape')
+        return {
+            "name": name,
+            "path": path,
+            "size": int(record["size"]),
+            "modified": float(record["modified"]),
+            "created": float(record["created"]),
+            "device": int(record["device"]),
+            "type": self.types[record["type_id"]],
+            "extension": self.extensions[record["extension_id"]],
+        }
+
+    def to_files(self, indices=None) -> List[Dict]:
+        """
+        Rebuild scan_directory dicts, for all entries or the given indices
+        """
+        if indices is None:
+            indices = range(len(self))
+        return [self.file(int(i)) for i in indices]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Return the inventory as a pandas DataFrame for reporting
+        """
+        records = self.records
+        return pd.DataFrame({
+            "name": [self.file(i)["name"] for i in range(len(self))],
+            "extension": np.asarray(self.extensions, dtype=object)[records["extension_id"]],
+            "type": np.asarray(self.types, dtype=object)[records["type_id"]],
+            "size": np.asarray(records["size"]),
+            "modified": np.asarray(records["modified"]),
+            "created": np.asarray(records["created"]),
+        })
+
+    def diff(self, previous: "ScanInventory") -> Dict[str, np.ndarray]:
+        """
+        Compare against an earlier inventory using the path hash column
+        Returns index arrays: 'added' and 'modified' index into this inventory,
+        'removed' indexes into the previous one
+        """
+        current_hashes = np.asarray(self.records["path_hash"])
+        previous_hashes = np.asarray(previous.records["path_hash"])
+
+        # Look up every current hash in the sorted previous hashes
+        order = np.argsort(previous_hashes, kind='stable')
+        sorted_previous = previous_hashes[order]
+        positions = np.searchsorted(sorted_previous, current_hashes)
+        positions[positions == len(sorted_previous)] = 0
+        found = (sorted_previous[positions] == current_hashes) if len(sorted_previous) else \
+            np.zeros(len(current_hashes), dtype=bool)
+
+        current_idx = np.flatnonzero(found)
+        previous_idx = order[positions[found]]
+        changed = (
+            (np.asarray(self.records["size"])[current_idx] != np.asarray(previous.records["size"])[previous_idx])
+            | (np.asarray(self.records["modified"])[current_idx] != np.asarray(previous.records["modified"])[previous_idx])
+        )
+
+        seen = np.zeros(len(previous_hashes), dtype=bool)
+        seen[previous_idx] = True
+        return {
+            "added": np.flatnonzero(~found),
+            "removed": np.flatnonzero(~seen),
+            "modified": current_idx[changed],
+        }
@@ -0,0 +1,120 @@
+import os
+import threading
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import Callable, Dict, List, Any, Tuple
+
+
+class DeviceScheduler:
+    def __init__(self, logger: logging.Logger, max_workers: int = 8, per_device: int = 1,
+                 per_destination: int = 4):
+        """
+        Run I/O tasks in parallel across filesystem devices while limiting
+        how many tasks touch the same device at once
+        Destination devices have their own, separate limit: many sources commonly
+        share one destination, which must not make them run one after another
+        """
+        self.logger = logger
+        self.max_workers = max(1, max_workers)
+        self.per_device = max(1, per_device)
+        self.per_destination = max(1, per_destination)
+        self._semaphores: Dict[Tuple[str, int], threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def device_of(path: str) -> int:
+        """
+        Return the st_dev of a path, using the nearest existing parent
+        for destinations that have not been created yet
+        """
+        current = Path(path).absolute()
+        while True:
+            try:
+                return os.stat(current).st_dev
+            except FileNotFoundError:
+                if current.parent == current:
+                    raise
+                current = current.parent
+
+    def run(self, tasks: List[Dict]) -> List[Any]:
+        """
+        Execute tasks and return their results in submission order
+        Each task is a dict with 'paths' (list of paths it reads, e.g. sources),
+        optionally 'dest_paths' (paths it writes to) and 'func' (callable)
+        """
+        if not tasks:
+            return []
+
+        devices = [
+            [("source", device) for device in self._devices_for(task['paths'])] +
+            [("dest", device) for device in self._devices_for(task.get('dest_paths', []))]
+            for task in tasks
+        ]
+
+        # Interleave tasks by their primary device so the pool is not
+        # filled with workers all waiting on the same disk
+        groups: Dict[Tuple[str, int], List[int]] = {}
+        for index, task_devices in enumerate(devices):
+            groups.setdefault(task_devices[0], []).append(index)
+        order = [
+            index
+            for batch in zip_longest(*groups.values())
+            for index in batch if index is not None
+        ]
+
+        self.logger.info(
+            f"Scheduling {len(tasks)} task(s) across {len(groups)} device(s), "
+            f"{self.per_device} concurrent per device, {self.per_destination} per destination"
+        )
+
+        results: List[Any] = [None] * len(tasks)
+        workers = min(self.max_workers, len(tasks))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                index: pool.submit(self._run_on_devices, devices[index], tasks[index]['func'])
+                for index in order
+            }
+            for index, future in futures.items():
+                results[index] = future.result()
+        return results
+
+    def _devices_for(self, paths: List[str]) -> List[int]:
+        """
+        Resolve the distinct devices of some paths, primary (first path) device first
+        An empty list of paths touches no device
+        """
+        if not paths:
+            return []
+        devices = []
+        for path in paths:
+            try:
+                device = self.device_of(path)
+            except OSError as e:
+                self.logger.error(f"Could not determine device for {path}: {e}")
+                continue
+            if device not in devices:
+                devices.append(device)
+        return devices or [-1]
+
+    def _run_on_devices(self, devices: List[Tuple[str, int]], func: Callable) -> Any:
+        """
+        Hold a slot on every device the task touches while it runs
+        Slots are acquired in sorted order so tasks spanning two devices cannot deadlock
+        """
+        semaphores = [self._semaphore(device) for device in sorted(devices)]
+        for semaphore in semaphores:
+            semaphore.acquire()
+        try:
+            return func()
+        finally:
+            for semaphore in reversed(semaphores):
+                semaphore.release()
+
+    def _semaphore(self, device: Tuple[str, int]) -> threading.Semaphore:
+        with self._lock:
+            if device not in self._semaphores:
+                limit = self.per_destination if device[0] == "dest" else self.per_device
+                self._semaphores[device] = threading.Semaphore(limit)
+            return self._semaphores[device]
@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from core import metrics
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+_FINISHED = ("completed", "failed", "cancelled")
+
+
+class JobManager:
+    def __init__(self, organizer, logger: logging.Logger, max_concurrent: int = 2, keep_finished: int = 100):
+        """
+        Queue organize jobs by priority and run a bounded number at once
+        on a shared pool of worker threads
+        Higher priorities run first; equal priorities run in submission order
+        Only the keep_finished most recently finished jobs are remembered
+        """
+        self.organizer = organizer
+        self.logger = logger
+        self.max_concurrent = max(1, max_concurrent)
+        self.keep_finished = max(0, keep_finished)
+        self._jobs: Dict[str, Dict] = {}
+        self._queue: List = []
+        self._counter = itertools.count(1)
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.max_concurrent)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        source_dir: str,
+        dest_dir: str,
+        use_ai: bool = False,
+        keep_originals: bool = False,
+        priority: int = 0
+    ) -> str:
+        """
+        Queue a source/destination pair for organizing
+        Returns the job id
+        """
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError("Job manager is shut down")
+            seq = next(self._counter)
+            job_id = f"job-{seq}"
+            self._jobs[job_id] = {
+                "id": job_id,
+                "source": source_dir,
+                "dest": dest_dir,
+                "use_ai": use_ai,
+                "keep_originals": keep_originals,
+                "priority": priority,
+                "state": "queued",
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "results": None,
+                "error": None,
+            }
+            heapq.heappush(self._queue, (-priority, seq, job_id))
+            self._condition.notify()
+        self.logger.info(f"Queued {job_id}: {source_dir} -> {dest_dir} (priority {priority})")
+        self._notify(job_id)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started yet
+        Returns False if the job is unknown or already running or finished
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] != "queued":
+                return False
+            job["state"] = "cancelled"
+            job["finished"] = time.time()
+            self._condition.notify_all()
+        self._notify(job_id)
+        self._prune()
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a snapshot of one job, or None if unknown
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self, state: Optional[str] = None) -> List[Dict]:
+        """
+        Return snapshots of all jobs in submission order, optionally filtered by state
+        """
+        with self._condition:
+            return [dict(job) for job in self._jobs.values() if state is None or job["state"] == state]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Block until a job finishes or the timeout expires
+        Returns the job snapshot, or None if unknown
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while job_id in self._jobs and self._jobs[job_id]["state"] not in _FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def add_listener(self, callback: Callable[[Dict], None]) -> None:
+        """
+        Call back with a job snapshot on every state change
+        Callbacks run on worker threads; GUIs must hand them to their own thread
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict], None]) -> None:
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting jobs, cancel queued ones and optionally wait for running jobs
+        """
+        with self._condition:
+            self._stopping = True
+            cancelled = [job for job in self._jobs.values() if job["state"] == "queued"]
+            for job in cancelled:
+                job["state"] = "cancelled"
+                job["finished"] = time.time()
+            self._condition.notify_all()
+        for job in cancelled:
+            self._notify(job["id"])
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _next_job(self) -> Optional[Dict]:
+        """
+        Take the highest-priority queued job, skipping cancelled ones
+        Returns None when shutting down
+        """
+        with self._condition:
+            while True:
+                while self._queue:
+                    _, _, job_id = heapq.heappop(self._queue)
+                    # Cancelled jobs may already have been pruned
+                    job = self._jobs.get(job_id)
+                    if job is not None and job["state"] == "queued":
+                        job["state"] = "running"
+                        job["started"] = time.time()
+                        return job
+                if self._stopping:
+                    return None
+                self._condition.wait()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._notify(job["id"])
+            self._run(job)
+            self._notify(job["id"])
+            self._prune()
+
+    def _prune(self) -> None:
+        """
+        Forget the oldest finished jobs beyond keep_finished, with their results
+        """
+        with self._condition:
+            finished = sorted(
+                (job for job in self._jobs.values() if job["state"] in _FINISHED),
+                key=lambda job: job["finished"]
+            )
+            for job in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job["id"]]
+
+    def _run(self, job: Dict) -> None:
+        state, results, error = "completed", None, None
+        try:
+            is_valid, message = self.organizer.validate_paths(job["source"], job["dest"])
+            if not is_valid:
+                raise ValueError(message)
+            results = self.organizer.organize(
+                job["source"], job["dest"], job["use_ai"], job["keep_originals"]
+            )
+        except Exception as e:
+            self.logger.error(f"Job {job['id']} failed: {e}")
+            state, error = "failed", str(e)
+        with self._condition:
+            job["state"] = state
+            job["results"] = results
+            job["error"] = error
+            job["finished"] = time.time()
+            self._condition.notify_all()
+
+    def _notify(self, job_id: str) -> None:
+        with self._condition:
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self._jobs.values():
+                counts[job["state"]] += 1
+        for state, count in counts.items():
+            metrics.JOBS.set(count, state=state)
+        metrics.QUEUE_DEPTH.set(counts["queued"], queue="jobs")
+
+        snapshot = self.get(job_id)
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.logger.error(f"Job listener failed: {e}")
@@ -1,9 +1,22 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 from pathlib import Path
 from ai_functions.categorization import AICategorizer
 from ai_functions.suggestions import AISuggester
+from ai_functions.local_classifier import LocalClassifier
+from ai_functions.name_clustering import NameClusterer
 from core.file_operations import FileOperations
+from core.io_scheduler import DeviceScheduler
+from core.image_metadata import ImageMetadataExtractor
+from core.archive_inspector import ArchiveInspector
+from core.inventory import ScanInventory
+from core.dir_snapshot import DirectorySnapshot
+from core.distributed import JobQueue
+from core.pipeline import OrganizePipeline
+from core import metrics
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import logging
+import hashlib
+import threading
 import time
 
 class FileOrganizer:
@@ -19,16 +32,33 @@ class FileOrganizer:
         self.ai_enabled = config['ai']['enable_suggestions'] and config['ai']['api_key']
         self.ai_categorizer = None
         self.ai_suggester = None
+        self.ai_executor = None
+        
+        # Local filename clustering proposes categories without calling the AI service
+        local_categories = config['ai'].get('categorization_model') == 'local'
+        self.name_clusterer = NameClusterer(logger) if local_categories else None
         
         if self.ai_enabled:
             try:
-                self.ai_categorizer = AICategorizer(config['ai']['api_key'], logger)
-                self.ai_suggester = AISuggester(config['ai']['api_key'], logger)
+                token_budget = config['ai'].get('prompt_token_budget', 1500)
+                if not local_categories:
+                    self.ai_categorizer = AICategorizer(config['ai']['api_key'], logger, token_budget)
+                self.ai_suggester = AISuggester(config['ai']['api_key'], logger, token_budget // 2)
+                # AI requests run in the background while files are being moved
+                self.ai_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai")
                 self.logger.info("AI components initialized successfully")
             except Exception as e:
                 self.logger.error(f"Failed to initialize AI components: {e}")
                 self.ai_enabled = False
 
+        # Serve metrics for Prometheus when a port is configured
+        metrics_port = config.get('metrics', {}).get('port', 0)
+        if metrics_port:
+            try:
+                metrics.start_http_server(metrics_port)
+            except OSError as e:
+                self.logger.error(f"Failed to start metrics endpoint on port {metrics_port}: {e}")
+
     def organize(
         self,
         source_dir: str,
@@ -49,61 +79,517 @@ class FileOrganizer:
             "suggestions": [],
             "custom_categories": {},
             "execution_time": 0,
-            "operation_mode": "copy" if keep_originals else "move"
+            "operation_mode": "copy" if keep_originals else "move",
+            "copy_strategies": {}
         }
 
+        use_ai = bool(use_ai and self.ai_enabled)
+        ai_requests = {}
+        outcome = "completed"
+
         try:
-            # 1. Scan source directory
-            files = self.file_ops.scan_directory(source_dir)
-            results["total_files"] = len(files)
-            
-            if not files:
-                self.logger.warning(f"No files found in {source_dir}")
-                return results
+            # 0. With a directory snapshot, only files in changed directories are organized
+            snapshot, entries = None, None
+            if self.config.get('snapshot', {}).get('enabled', False):
+                snapshot, entries = self._scan_snapshot(source_dir, dest_dir, results)
 
-            # 2. Get AI custom categories if enabled
-            if use_ai and self.ai_enabled and len(files) > 0:
-                try:
-                    results["custom_categories"] = self._get_ai_categories(files)
-                    self.logger.info("Received AI-generated categories")
-                except Exception as e:
-                    self.logger.error(f"AI categorization failed: {e}")
-
-            # 3. Organize files
-            organized, failures = self.file_ops.organize_files(
-                files,
-                self.config,
-                dest_dir,
-                keep_originals
-            )
-            results["organized"] = organized
-            results["failures"] = failures
+            if self.config.get('pipeline', {}).get('enabled', False):
+                # 1-3. Scan, detect, plan and move concurrently as a pipeline
+                # AI requests start as soon as the first batch has been typed
+                def on_batch(batch: List[Dict]) -> None:
+                    if use_ai and not ai_requests:
+                        ai_requests.update(self._start_ai_requests(batch, dest_dir))
+
+                files = self._organize_pipelined(
+                    source_dir, dest_dir, keep_originals, results, on_batch, entries
+                )
+                results["total_files"] = len(files)
+                if snapshot is None:
+                    self._record_inventory(source_dir, files, results)
 
-            # 4. Cleanup empty directories
-            if not keep_originals:
+                if not files:
+                    self._save_snapshot(source_dir, snapshot, results)
+                    self.logger.warning(f"No files found in {source_dir}")
+                    return results
+            else:
+                # 1. Scan source directory
+                files = self.file_ops.scan_directory(source_dir, self.config, [dest_dir], entries)
+                results["total_files"] = len(files)
+                if snapshot is None:
+                    self._record_inventory(source_dir, files, results)
+
+                if not files:
+                    self._save_snapshot(source_dir, snapshot, results)
+                    self.logger.warning(f"No files found in {source_dir}")
+                    return results
+
+                # 2. Start AI requests in the background; they are joined in step 5
+                if use_ai:
+                    ai_requests = self._start_ai_requests(files, dest_dir)
+
+                # 2b. Assign categories from content classification and image metadata
+                classifier = self._train_classifier(dest_dir)
+                results.update(self._prepare_files(files, classifier))
+
+                # 3. Organize files
+                organized, failures = self.file_ops.organize_files(
+                    files,
+                    self.config,
+                    dest_dir,
+                    keep_originals,
+                    stats=results
+                )
+                results["organized"] = organized
+                results["failures"] = failures
+
+            # Moved files are no longer in the source
+            moved = [] if keep_originals else [f['path'] for f in files]
+            self._save_snapshot(source_dir, snapshot, results, moved)
+
+            # 4. Cleanup empty directories, only where files were taken from when using a snapshot
+            if not keep_originals and snapshot is None:
                 results["empty_dirs_removed"] = self.file_ops.cleanup_empty_dirs(source_dir)
+            elif not keep_originals:
+                results["empty_dirs_removed"] = self.file_ops.remove_empty_dirs(
+                    source_dir, {str(Path(f['path']).parent) for f in files}
+                )
 
-            # 5. Get AI suggestions if enabled
-            if use_ai and self.ai_enabled and len(files) > 0:
-                try:
-                    sample_files = files[:min(5, len(files))]
-                    results["suggestions"] = self._get_ai_suggestions(sample_files, dest_dir)
-                    self.logger.info("Received AI suggestions")
-                except Exception as e:
-                    self.logger.error(f"AI suggestions failed: {e}")
+            # 4b. Propose categories from filename clusters when configured
+            if self.name_clusterer is not None:
+                results["custom_categories"] = self.name_clusterer.generate_categories(files)
+
+            # 5. Collect AI categories and suggestions, waiting at most ai.timeout seconds
+            if ai_requests:
+                self._collect_ai_results(ai_requests, results)
 
         except Exception as e:
             self.logger.error(f"Organization failed: {e}")
+            outcome = "failed"
             raise
         finally:
             results["execution_time"] = round(time.time() - start_time, 2)
+            self._record_run_metrics(outcome, time.time() - start_time)
             self.logger.info(
                 f"Organization completed in {results['execution_time']}s. "
-                f"{organized}/{results['total_files']} files processed."
+                f"{results['organized']}/{results['total_files']} files processed."
             )
 
         return results
 
+    def organize_multiple(
+        self,
+        sources: List[str],
+        dest_dirs: Union[str, List[str]],
+        use_ai: bool = False,
+        keep_originals: bool = False
+    ) -> Dict:
+        """
+        Organize several source directories in one job
+        Sources on different devices run in parallel, with limited concurrency per device
+        Returns combined results plus a per-source breakdown under 'jobs'
+        """
+        if isinstance(dest_dirs, str):
+            dest_dirs = [dest_dirs] * len(sources)
+        if len(dest_dirs) != len(sources):
+            raise ValueError("Number of destinations must match number of sources")
+
+        start_time = time.time()
+        io_config = self.config.get('io', {})
+        scheduler = DeviceScheduler(
+            self.logger,
+            max_workers=io_config.get('max_workers', 8),
+            per_device=io_config.get('per_device_concurrency', 1),
+            per_destination=io_config.get('per_destination_concurrency', 4)
+        )
+
+        tasks = [
+            {
+                "paths": [source],
+                "dest_paths": [dest],
+                "func": lambda s=source, d=dest: self._organize_job(s, d, use_ai, keep_originals)
+            }
+            for source, dest in zip(sources, dest_dirs)
+        ]
+        jobs = scheduler.run(tasks)
+
+        results = {
+            "total_files": sum(job.get("total_files", 0) for job in jobs),
+            "organized": sum(job.get("organized", 0) for job in jobs),
+            "failures": sum(job.get("failures", 0) for job in jobs),
+            "empty_dirs_removed": sum(job.get("empty_dirs_removed", 0) for job in jobs),
+            "suggestions": [s for job in jobs for s in job.get("suggestions", [])],
+            "custom_categories": {},
+            "execution_time": round(time.time() - start_time, 2),
+            "operation_mode": "copy" if keep_originals else "move",
+            "copy_strategies": self._sum_counts(job.get("copy_strategies", {}) for job in jobs),
+            "jobs": jobs
+        }
+        return results
+
+    @staticmethod
+    def _sum_counts(counters) -> Dict:
+        """
+        Add up a sequence of {name: count} dictionaries
+        """
+        total = {}
+        for counter in counters:
+            for name, count in counter.items():
+                total[name] = total.get(name, 0) + count
+        return total
+
+    def _organize_job(self, source: str, dest: str, use_ai: bool, keep_originals: bool) -> Dict:
+        """
+        Run one source/destination pair, capturing errors in its result
+        """
+        try:
+            results = self.organize(source, dest, use_ai, keep_originals)
+        except Exception as e:
+            results = {"total_files": 0, "organized": 0, "failures": 0, "error": str(e)}
+        results["source"] = source
+        results["dest"] = dest
+        return results
+
+    def _organize_pipelined(
+        self,
+        source_dir: str,
+        dest_dir: str,
+        keep_originals: bool,
+        results: Dict,
+        on_batch=None,
+        entries=None
+    ) -> List[Dict]:
+        """
+        Run scanning, type detection, planning and moving as concurrent stages
+        on_batch is called with each detected batch, one batch at a time
+        entries, if given, replace the directory scan
+        Returns the list of scanned files
+        """
+        classifier = self._train_classifier(dest_dir)
+        lock = threading.Lock()
+
+        def prepare(batch: List[Dict]) -> None:
+            # Runs on the detect workers, so image headers are read inline
+            counts = self._prepare_files(batch, classifier, workers=1)
+            with lock:
+                for name, count in counts.items():
+                    results[name] = results.get(name, 0) + count
+                if on_batch is not None:
+                    on_batch(batch)
+
+        pipeline = OrganizePipeline(self.file_ops, self.config, self.logger, prepare)
+        outcome = pipeline.run(source_dir, dest_dir, keep_originals, entries)
+        results["organized"] = outcome["organized"]
+        results["failures"] = outcome["failures"]
+        results["failed_paths"] = outcome["failed_paths"]
+        results["copy_strategies"] = outcome["copy_strategies"]
+        for key in ("throttle_wait_seconds", "verified_copies"):
+            if key in outcome:
+                results[key] = outcome[key]
+        results["pipeline_stages"] = outcome["stages"]
+        return outcome["files"]
+
+    def _prepare_files(self, files: List[Dict], classifier=None, workers=None) -> Dict:
+        """
+        Assign categories to files before planning, from the local classifier,
+        image header metadata and archive listings when those are enabled
+        Returns counts of classified files, images with metadata and inspected archives
+        """
+        counts = {}
+        if classifier is not None:
+            try:
+                counts["classified"] = self._classify_unknown(files, classifier)
+            except Exception as e:
+                self.logger.error(f"Local classification failed: {e}")
+        if self.config.get('image_metadata', {}).get('enabled', False):
+            try:
+                counts["images_with_metadata"] = self._apply_image_metadata(files, workers)
+            except Exception as e:
+                self.logger.error(f"Image metadata extraction failed: {e}")
+        if self.config.get('archive_inspection', {}).get('enabled', False):
+            try:
+                counts["archives_inspected"] = self._apply_archive_inspection(files, workers)
+            except Exception as e:
+                self.logger.error(f"Archive inspection failed: {e}")
+        return counts
+
+    def _train_classifier(self, dest_dir: str):
+        """
+        Train the offline classifier on what is already organized in the destination
+        Returns None when the classifier is disabled or could not be trained
+        """
+        settings = self.config.get('classifier', {})
+        if not settings.get('enabled', False):
+            return None
+        try:
+            classifier = LocalClassifier(
+                self.logger,
+                sample_bytes=settings.get('sample_bytes', 4096),
+                min_confidence=settings.get('min_confidence', 0.35),
+                max_training_files=settings.get('max_training_files', 200),
+                batch_size=settings.get('batch_size', 1024)
+            )
+            return classifier if classifier.train(dest_dir) else None
+        except Exception as e:
+            self.logger.error(f"Local classifier training failed: {e}")
+            return None
+
+    def _classify_unknown(self, files: List[Dict], classifier: LocalClassifier) -> int:
+        """
+        Assign categories to files that would otherwise land in "others"
+        Returns the number of files that received a category
+        """
+        unknown = [
+            f for f in files
+            if self.file_ops._determine_target_folder(f, self.config) == 'others'
+        ]
+        if not unknown:
+            return 0
+
+        classified = 0
+        for file, category in zip(unknown, classifier.classify(unknown)):
+            if category:
+                file['category'] = category
+                classified += 1
+        self.logger.debug(f"Local classifier categorized {classified}/{len(unknown)} unknown files")
+        return classified
+
+    def _apply_image_metadata(self, files: List[Dict], workers=None) -> int:
+        """
+        Extract header metadata for files in the images category and
+        assign them a folder from the configured template
+        Returns the number of images whose metadata could be read
+        """
+        images = [
+            f for f in files
+            if self.file_ops._determine_target_folder(f, self.config) == 'images'
+        ]
+        if not images:
+            return 0
+
+        settings = self.config.get('image_metadata', {})
+        template = settings.get('folder_template', '{category}/{year}/{month}')
+        extractor = ImageMetadataExtractor(self.logger, workers or settings.get('workers'))
+        extracted = extractor.extract(images)
+        for file in images:
+            try:
+                file['category'] = extractor.target_folder(file, template, 'images')
+            except (KeyError, IndexError, ValueError) as e:
+                self.logger.error(f"Invalid image folder template '{template}': {e}")
+                break
+        self.logger.debug(f"Read image metadata for {extracted}/{len(images)} images")
+        return extracted
+
+    def _apply_archive_inspection(self, files: List[Dict], workers=None) -> int:
+        """
+        List the contents of files in the archives category and assign them
+        a folder from the configured template based on what they mostly contain
+        Returns the number of archives whose listing could be read
+        """
+        archives = [
+            f for f in files
+            if self.file_ops._determine_target_folder(f, self.config) == 'archives'
+        ]
+        if not archives:
+            return 0
+
+        settings = self.config.get('archive_inspection', {})
+        template = settings.get('folder_template', '{category}/{content}')
+        inspector = ArchiveInspector(self.logger, self.config['file_types'], workers or settings.get('workers'))
+        inspected = inspector.inspect(archives)
+        for file in archives:
+            try:
+                file['category'] = inspector.target_folder(file, template, 'archives')
+            except (KeyError, IndexError, ValueError) as e:
+                self.logger.error(f"Invalid archive folder template '{template}': {e}")
+                break
+        self.logger.debug(f"Listed {inspected}/{len(archives)} archives")
+        return inspected
+
+    def snapshot_path(self, source_dir: str) -> Path:
+        """
+        Location of the saved directory snapshot for a source directory
+        """
+        base = self.config.get('snapshot', {}).get('directory') or \
+            str(Path.home() / ".aifileorganizer" / "snapshots")
+        key = hashlib.sha1(str(Path(source_dir).resolve()).encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+        return Path(base) / f"{key}.json"
+
+    def _scan_snapshot(self, source_dir: str, dest_dir: str, results: Dict):
+        """
+        Scan the source against its last snapshot, storing the change counts in results
+        Returns (snapshot, entries of added and modified files)
+        """
+        previous = DirectorySnapshot.load(str(self.snapshot_path(source_dir)))
+        snapshot, changes = self.file_ops.scan_changes(source_dir, self.config, previous, [dest_dir])
+        results["snapshot_changes"] = {
+            "added": len(changes["added"]),
+            "modified": len(changes["modified"]),
+            "removed": len(changes["removed"]),
+            "dirs_listed": changes["dirs_listed"],
+            "dirs_reused": changes["dirs_reused"],
+        }
+        self.logger.debug(f"Snapshot scan of {source_dir}: {results['snapshot_changes']}")
+        return snapshot, changes["added"] + changes["modified"]
+
+    def _save_snapshot(self, source_dir: str, snapshot, results: Dict, moved: List[str] = ()) -> None:
+        """
+        Save the snapshot for the next run; files that failed stay pending so they are retried
+        Moved files are dropped too, so a new file reusing a name counts as added, not modified
+        """
+        if snapshot is None:
+            return
+        snapshot.forget(list(results.get("failed_paths", [])) + list(moved))
+        try:
+            snapshot.save(str(self.snapshot_path(source_dir)))
+        except OSError as e:
+            self.logger.error(f"Failed to save directory snapshot: {e}")
+
+    def _record_inventory(self, source_dir: str, files: List[Dict], results: Dict) -> None:
+        """
+        Save the scan inventory when enabled, storing the diff counts in results
+        """
+        if not self.config.get('inventory', {}).get('enabled', False):
+            return
+        try:
+            results["inventory_changes"] = self._update_inventory(source_dir, files)
+        except Exception as e:
+            self.logger.error(f"Failed to update scan inventory: {e}")
+
+    def _start_ai_requests(self, files: List[Dict], dest_dir: str) -> Dict:
+        """
+        Submit AI categorization and suggestion requests to run in the background
+        Returns a dictionary mapping result keys to futures
+        """
+        # Snapshot the fields the prompts use, later steps add keys to the file dictionaries
+        snapshot = [
+            {"name": f['name'], "type": f.get('type', ''), "size": f.get('size', 0),
+             "extension": f.get('extension', '')}
+            for f in files
+        ]
+        requests = {
+            "suggestions": self.ai_executor.submit(
+                self._call_ai, "suggestions", self._get_ai_suggestions, snapshot, dest_dir
+            ),
+        }
+        if self.ai_categorizer:
+            requests["custom_categories"] = self.ai_executor.submit(
+                self._call_ai, "categories", self._get_ai_categories, snapshot
+            )
+        return requests
+
+    def _call_ai(self, kind: str, func, *args):
+        """
+        Run one AI request, recording its count, outcome and latency
+        """
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args)
+            outcome = "ok"
+            return result
+        finally:
+            metrics.AI_REQUESTS.inc(kind=kind, outcome=outcome)
+            metrics.AI_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
+    def _record_run_metrics(self, outcome: str, elapsed: float) -> None:
+        """
+        Count a finished run and refresh the textfile collector output if configured
+        """
+        metrics.RUNS.inc(outcome=outcome)
+        metrics.RUN_SECONDS.observe(elapsed)
+        textfile = self.config.get('metrics', {}).get('textfile', '')
+        if textfile:
+            try:
+                metrics.REGISTRY.write_textfile(textfile)
+            except OSError as e:
+                self.logger.error(f"Failed to write metrics to {textfile}: {e}")
+
+    def _collect_ai_results(self, requests: Dict, results: Dict) -> None:
+        """
+        Wait for background AI requests, sharing one ai.timeout budget between them
+        Requests that are not done in time are left running and reported in 'ai_timed_out'
+        """
+        deadline = time.time() + self.config['ai'].get('timeout', 10)
+        for key, future in requests.items():
+            try:
+                results[key] = future.result(timeout=max(0, deadline - time.time()))
+                self.logger.info(f"Received AI {key.replace('_', ' ')}")
+            except FutureTimeoutError:
+                self.logger.warning(f"AI {key.replace('_', ' ')} timed out, reporting without them")
+                # The request keeps running; _call_ai records its final outcome
+                metrics.AI_TIMEOUTS.inc(kind=key.split('_')[-1])
+                results.setdefault("ai_timed_out", []).append(key)
+            except Exception as e:
+                self.logger.error(f"AI request for {key.replace('_', ' ')} failed: {e}")
+
+    def submit_distributed(
+        self,
+        source_dir: str,
+        dest_dir: str,
+        queue_dir: str,
+        keep_originals: bool = False
+    ) -> str:
+        """
+        Scan and plan a source directory, then hand the operations to queue workers
+        Workers on any host sharing queue_dir can execute the job
+        Returns the job id
+        """
+        settings = self.config.get('distributed', {})
+        files = self.file_ops.scan_directory(source_dir, self.config, [dest_dir])
+        targets = self.file_ops.plan_targets(files, self.config)
+        queue = JobQueue(queue_dir, self.logger, settings.get('lease_seconds', 300))
+        return queue.submit(
+            files,
+            targets,
+            dest_dir,
+            keep_originals,
+            chunk_size=settings.get('chunk_size', 500)
+        )
+
+    def inventory_path(self, source_dir: str) -> Path:
+        """
+        Location of the saved scan inventory for a source directory
+        """
+        base = self.config.get('inventory', {}).get('directory') or \
+            str(Path.home() / ".aifileorganizer" / "inventories")
+        key = hashlib.sha1(str(Path(source_dir).resolve()).encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+        return Path(base) / key
+
+    def load_inventory(self, source_dir: str):
+        """
+        Memory-map the last saved scan inventory for a source directory
+        Returns None if no inventory has been saved yet
+        """
+        return ScanInventory.load(str(self.inventory_path(source_dir)))
+
+    def plan(self, source_dir: str) -> List[Dict]:
+        """
+        Plan target folders for the last saved inventory without touching any files
+        Returns list of dictionaries with 'path' and 'target'
+        """
+        inventory = self.load_inventory(source_dir)
+        if inventory is None:
+            return []
+        files = inventory.to_files()
+        targets = self.file_ops.plan_targets(files, self.config)
+        return [{"path": f['path'], "target": t} for f, t in zip(files, targets)]
+
+    def _update_inventory(self, source_dir: str, files: List[Dict]) -> Dict:
+        """
+        Save the scan as a columnar inventory and diff it against the previous run
+        Returns counts of added, removed and modified files
+        """
+        path = self.inventory_path(source_dir)
+        inventory = ScanInventory.from_files(files, source=source_dir)
+        previous = ScanInventory.load(str(path))
+        changes = {"added": len(inventory), "removed": 0, "modified": 0}
+        if previous is not None:
+            changes = {name: len(idx) for name, idx in inventory.diff(previous).items()}
+            # Release the memory map before the files are replaced
+            del previous
+        inventory.save(str(path))
+        return changes
+
     def _get_ai_categories(self, files: List[Dict]) -> Dict:
         """
         Get AI-generated custom categories for files
@@ -111,9 +597,8 @@ class FileOrganizer:
         if not self.ai_categorizer:
             return {}
         
-        # Limit to first 20 files to manage token usage
-        sample_files = files[:20]
-        return self.ai_categorizer.generate_categories(sample_files)
+        # The categorizer summarizes all files within its token budget
+        return self.ai_categorizer.generate_categories(files)
 
     def _get_ai_suggestions(self, files: List[Dict], dest_dir: str) -> List[str]:
         """
@@ -134,6 +619,16 @@ class FileOrganizer:
             self.logger.error(f"Report generation failed: {e}")
             return False
 
+    def search_catalog(self, query: str, category: str = None, limit: int = 100) -> List[Dict]:
+        """
+        Search the catalog of organized files by name, category or path
+        Returns an empty list when the catalog is disabled
+        """
+        catalog = self.file_ops.get_catalog(self.config)
+        if catalog is None:
+            return []
+        return catalog.search(query, category, limit)
+
     def validate_paths(self, source: str, dest: str) -> Tuple[bool, str]:
         """
         Validate source and destination paths before organization
@@ -0,0 +1,203 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+from core.file_operations import FileOperations
+from core import metrics
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class PipelineStage:
+    def __init__(self, name: str, func: Callable, workers: int, inbox: queue.Queue,
+                 outbox: Optional[queue.Queue], logger: logging.Logger, downstream_workers: int = 0):
+        """
+        A pool of threads taking batches from an inbox and putting results in an outbox
+        Bounded queues between stages give backpressure: a slow stage blocks its producers
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.logger = logger
+        self.downstream_workers = downstream_workers
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self._remaining = self.workers
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"pipeline-{self.name}-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+    def _work(self) -> None:
+        while True:
+            batch = self.inbox.get()
+            if batch is _DONE:
+                break
+            metrics.QUEUE_DEPTH.set(self.inbox.qsize(), queue=f"pipeline_{self.name}")
+            started = time.perf_counter()
+            try:
+                result = self.func(batch)
+            except Exception as e:
+                self.logger.error(f"Pipeline stage '{self.name}' failed on a batch: {e}")
+                result = None
+            with self._lock:
+                self.batches += 1
+                self.busy_seconds += time.perf_counter() - started
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+        metrics.QUEUE_DEPTH.set(0, queue=f"pipeline_{self.name}")
+        self._finish()
+
+    def _finish(self) -> None:
+        """
+        The last worker to exit tells every downstream worker to stop
+        """
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last and self.outbox is not None:
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_DONE)
+
+
+class OrganizePipeline:
+    def __init__(
+        self,
+        file_ops: FileOperations,
+        config: Dict,
+        logger: logging.Logger,
+        prepare: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        """
+        Run scan -> detect -> plan -> execute as concurrent stages joined by bounded queues
+        so files start moving as soon as their type is known
+        prepare is called on each detected batch before planning (e.g. to assign categories)
+        """
+        self.file_ops = file_ops
+        self.config = config
+        self.logger = logger
+        self.prepare = prepare
+        settings = config.get('pipeline', {})
+        self.batch_size = max(1, settings.get('batch_size', 100))
+        self.queue_batches = max(1, settings.get('queue_size', 1000) // self.batch_size)
+        self.detect_workers = settings.get('detect_workers', 4)
+        self.plan_workers = 1
+        self.execute_workers = settings.get('execute_workers', 2)
+
+    def run(self, source_dir: str, dest_dir: str, keep_originals: bool = False,
+            entries: Optional[List[os.DirEntry]] = None) -> Dict:
+        """
+        Organize a directory through the pipeline
+        Pre-selected entries, if given, are fed to the pipeline instead of scanning
+        Returns a dictionary with 'files', 'organized', 'failures', 'failed_paths',
+        'copy_strategies' and per-stage statistics under 'stages'
+        """
+        known_extensions = self.file_ops.known_extensions(self.config)
+        results = {"files": [], "organized": 0, "failures": 0, "failed_paths": [], "copy_strategies": {}}
+        results_lock = threading.Lock()
+
+        def detect(entries: List[os.DirEntry]) -> List[Dict]:
+            files = []
+            for entry in entries:
+                try:
+                    files.append(self.file_ops.describe_entry(entry, known_extensions))
+                except Exception as e:
+                    self.logger.error(f"Error processing file {entry.path}: {e}")
+            if self.prepare is not None:
+                self.prepare(files)
+            with results_lock:
+                results["files"].extend(files)
+            return files
+
+        def plan(files: List[Dict]):
+            return files, self.file_ops.plan_targets(files, self.config)
+
+        def execute(planned):
+            files, targets = planned
+            stats = {}
+            organized, failures = self.file_ops.execute_plan(
+                files, targets, self.config, dest_dir, keep_originals, stats=stats
+            )
+            with results_lock:
+                results["organized"] += organized
+                results["failures"] += failures
+                results["failed_paths"].extend(stats.get("failed_paths", []))
+                for name, count in stats.get("copy_strategies", {}).items():
+                    results["copy_strategies"][name] = results["copy_strategies"].get(name, 0) + count
+                if stats.get("verified_copies"):
+                    results.setdefault("verified_copies", []).extend(stats["verified_copies"])
+                if "throttle_wait_seconds" in stats:
+                    results["throttle_wait_seconds"] = round(
+                        results.get("throttle_wait_seconds", 0) + stats["throttle_wait_seconds"], 3
+                    )
+
+        scanned = queue.Queue(self.queue_batches)
+        detected = queue.Queue(self.queue_batches)
+        planned = queue.Queue(self.queue_batches)
+        execute_stage = PipelineStage(
+            "execute", execute, self.execute_workers, planned, None, self.logger
+        )
+        plan_stage = PipelineStage(
+            "plan", plan, self.plan_workers, detected, planned, self.logger, execute_stage.workers
+        )
+        detect_stage = PipelineStage(
+            "detect", detect, self.detect_workers, scanned, detected, self.logger, plan_stage.workers
+        )
+        stages = [detect_stage, plan_stage, execute_stage]
+        for stage in stages:
+            stage.start()
+
+        # The scan stage runs on the calling thread and feeds the first queue
+        scan_started = time.perf_counter()
+        scan_batches = 0
+        batch: List[os.DirEntry] = []
+        try:
+            if entries is None:
+                entries = self.file_ops.iter_entries(source_dir, self.config, [dest_dir])
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    scanned.put(batch)
+                    scan_batches += 1
+                    batch = []
+        except Exception as e:
+            self.logger.error(f"Error scanning directory {source_dir}: {e}")
+        if batch:
+            scanned.put(batch)
+            scan_batches += 1
+        for _ in range(detect_stage.workers):
+            scanned.put(_DONE)
+
+        for stage in stages:
+            stage.join()
+
+        results["stages"] = {
+            # Scan time includes waiting on a full queue, i.e. backpressure
+            "scan": {"workers": 1, "batches": scan_batches,
+                     "elapsed_seconds": round(time.perf_counter() - scan_started, 3)},
+        }
+        for stage in stages:
+            results["stages"][stage.name] = stage.stats()
+        return results
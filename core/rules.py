@@ -0,0 +1,193 @@
+import re
+import time
+import fnmatch
+import logging
+import numpy as np
+from typing import List, Dict, Optional
+
+# Glob patterns of the form "*.ext" are matched against the extension column directly
+# Only single-dot extensions qualify: the column holds Path.suffix, so "*.tar.gz" must use the glob
+_EXTENSION_GLOB = re.compile(r'^\*(\.[^*?\[\]/.]+)$')
+
+SECONDS_PER_DAY = 86400
+
+
+class CompiledRule:
+    def __init__(self, rule: Dict, order: int):
+        """
+        Compile a single rule definition into fast predicates
+        Raises ValueError for malformed rules
+        """
+        self.name = rule.get('name', f"rule_{order}")
+        self.priority = int(rule.get('priority', 0))
+        self.order = order
+        self.target = rule.get('target')
+        if not self.target:
+            raise ValueError(f"Rule '{self.name}' has no target")
+
+        flags = 0 if rule.get('case_sensitive', False) else re.IGNORECASE
+
+        # Name predicate: either a set of extensions or a regular expression
+        self.extensions = None
+        self.name_regex = None
+        patterns = rule.get('pattern')
+        if patterns:
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            ext_matches = [_EXTENSION_GLOB.match(p) for p in patterns]
+            # Extensions are stored lowercased, so the fast path only applies case-insensitively
+            if all(ext_matches) and flags & re.IGNORECASE:
+                self.extensions = [m.group(1).lower() for m in ext_matches]
+            else:
+                self.name_regex = re.compile(
+                    "|".join(fnmatch.translate(p) for p in patterns), flags
+                )
+        if rule.get('regex'):
+            if self.name_regex is not None or self.extensions is not None:
+                raise ValueError(f"Rule '{self.name}' cannot combine 'pattern' and 'regex'")
+            self.name_regex = re.compile(rule['regex'], flags)
+
+        # MIME predicate, glob syntax such as "image/*"
+        self.mime_regex = re.compile(fnmatch.translate(rule['mime'])) if rule.get('mime') else None
+
+        self.min_size = rule.get('min_size')
+        self.max_size = rule.get('max_size')
+        self.min_age_days = rule.get('min_age_days')
+        self.max_age_days = rule.get('max_age_days')
+
+
+class RuleEngine:
+    def __init__(self, rules: List[Dict], logger: logging.Logger):
+        """
+        Compile rule definitions once, ordered by priority (highest first)
+        Invalid rules are logged and skipped
+        """
+        self.logger = logger
+        self.rules: List[CompiledRule] = []
+        for order, rule in enumerate(rules or []):
+            try:
+                self.rules.append(CompiledRule(rule, order))
+            except (ValueError, re.error, TypeError) as e:
+                self.logger.error(f"Skipping invalid rule {rule.get('name', order)}: {e}")
+        self.rules.sort(key=lambda r: (-r.priority, r.order))
+
+    def assign_targets(
+        self,
+        files: List[Dict],
+        default_targets: List[str],
+        now: Optional[float] = None
+    ) -> List[str]:
+        """
+        Evaluate all rules over a batch of files and return a target folder per file
+        Files matching no rule keep their default target
+        """
+        if not self.rules or not files:
+            return list(default_targets)
+
+        now = time.time() if now is None else now
+        columns = self._build_columns(files, now)
+
+        # Index of the winning rule for every file, -1 when none matched yet
+        winner = np.full(len(files), -1, dtype=np.int32)
+        for index, rule in enumerate(self.rules):
+            candidates = winner == -1
+            if not candidates.any():
+                break
+            mask = self._evaluate(rule, columns, candidates)
+            winner[mask] = index
+
+        return self._render_targets(winner, columns, default_targets)
+
+    def _build_columns(self, files: List[Dict], now: float) -> Dict:
+        """
+        Convert the list of file dicts into NumPy column arrays
+        """
+        count = len(files)
+        modified = np.fromiter((f.get('modified', 0) for f in files), dtype=np.float64, count=count)
+        # Dates are bucketed in UTC so results do not depend on the host timezone
+        stamps = modified.astype('datetime64[s]')
+        return {
+            "names": [f.get('name', '') for f in files],
+            "extensions": np.array([f.get('extension', '').lower() for f in files], dtype=object),
+            "types": np.array([f.get('type', '') or '' for f in files], dtype=object),
+            "sizes": np.fromiter((f.get('size', 0) for f in files), dtype=np.int64, count=count),
+            "ages": (now - modified) / SECONDS_PER_DAY,
+            "years": stamps.astype('datetime64[Y]').astype(np.int64) + 1970,
+            "months": stamps.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+            "days": (stamps.astype('datetime64[D]') - stamps.astype('datetime64[M]')).astype(np.int64) + 1,
+        }
+
+    def _evaluate(self, rule: CompiledRule, columns: Dict, mask: np.ndarray) -> np.ndarray:
+        """
+        Narrow a boolean mask down to the files matching every predicate of a rule
+        Cheap numeric predicates run first so string matching sees fewer rows
+        """
+        mask = mask.copy()
+        if rule.min_size is not None:
+            mask &= columns["sizes"] >= rule.min_size
+        if rule.max_size is not None:
+            mask &= columns["sizes"] <= rule.max_size
+        if rule.min_age_days is not None:
+            mask &= columns["ages"] >= rule.min_age_days
+        if rule.max_age_days is not None:
+            mask &= columns["ages"] <= rule.max_age_days
+        if rule.extensions is not None:
+            mask &= np.isin(columns["extensions"], rule.extensions)
+        if rule.mime_regex is not None and mask.any():
+            mask &= self._match_unique(rule.mime_regex, columns["types"])
+        if rule.name_regex is not None and mask.any():
+            rows = np.flatnonzero(mask)
+            names = columns["names"]
+            hits = np.fromiter(
+                (rule.name_regex.match(names[i]) is not None for i in rows),
+                dtype=bool, count=len(rows)
+            )
+            mask[rows[~hits]] = False
+        return mask
+
+    def _match_unique(self, regex, values: np.ndarray) -> np.ndarray:
+        """
+        Match a regex once per distinct value and broadcast the result back
+        """
+        uniques, inverse = np.unique(values, return_inverse=True)
+        hits = np.array([regex.match(v) is not None for v in uniques], dtype=bool)
+        return hits[inverse]
+
+    def _render_targets(self, winner: np.ndarray, columns: Dict, default_targets: List[str]) -> List[str]:
+        """
+        Expand target templates such as "{category}/{year}/{month}" for matched files
+        Each distinct combination of rule and fields is formatted only once
+        """
+        targets = list(default_targets)
+        rows = np.flatnonzero(winner >= 0)
+        keys = zip(
+            winner[rows].tolist(),
+            [default_targets[i] for i in rows.tolist()],
+            columns["years"][rows].tolist(),
+            columns["months"][rows].tolist(),
+            columns["days"][rows].tolist(),
+            columns["extensions"][rows].tolist(),
+        )
+        rendered = {}
+        for i, key in zip(rows.tolist(), keys):
+            target = rendered.get(key)
+            if target is None:
+                target = rendered[key] = self._format_target(self.rules[key[0]], *key[1:])
+            targets[i] = target
+        return targets
+
+    def _format_target(self, rule: CompiledRule, category: str, year: int, month: int, day: int, extension: str) -> str:
+        """
+        Format a rule target template, falling back to the default category on errors
+        """
+        try:
+            return rule.target.format(
+                category=category,
+                year=f"{year:04d}",
+                month=f"{month:02d}",
+                day=f"{day:02d}",
+                extension=extension.lstrip('.') or 'none',
+            )
+        except (KeyError, IndexError, ValueError) as e:
+            self.logger.error(f"Invalid target template in rule '{rule.name}': {e}")
+            return category
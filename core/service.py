@@ -0,0 +1,278 @@
+import os
+import hmac
+import json
+import queue
+import logging
+import secrets
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from core.organizer import FileOrganizer
+from core.jobs import JobManager
+from core import metrics
+
+_FINISHED = ("completed", "failed", "cancelled")
+
+# Host headers accepted on TCP besides the configured host; anything else may be DNS rebinding
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Routes:
+      GET    /health               service status
+      GET    /metrics              Prometheus metrics
+      GET    /jobs                 all jobs
+      POST   /jobs                 submit {"source", "dest", "use_ai", "keep_originals", "priority"}
+      GET    /jobs/<id>            one job
+      DELETE /jobs/<id>            cancel a queued job
+      GET    /jobs/<id>/events     stream job updates as JSON lines until it finishes
+    Every route but /health needs "Authorization: Bearer <token>" when the service has a token
+    """
+    service: "OrganizerService" = None
+
+    def do_GET(self):
+        parts = self._parts()
+        if not self._authorized(public=parts == ["health"]):
+            return
+        if parts == ["health"]:
+            self._send(200, self.service.health())
+        elif parts == ["metrics"]:
+            data = metrics.REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", metrics.CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif parts == ["jobs"]:
+            self._send(200, self.service.jobs.jobs())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            self._send_job(parts[1])
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self._stream_events(parts[1])
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self._parts() != ["jobs"]:
+            self._send(404, {"error": "not found"})
+            return
+        # Browsers cannot send application/json cross-origin without a CORS preflight
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            job_id = self.service.jobs.submit(
+                body["source"],
+                body["dest"],
+                bool(body.get("use_ai", False)),
+                bool(body.get("keep_originals", False)),
+                int(body.get("priority", 0))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": f"invalid job request: {e}"})
+            return
+        except RuntimeError as e:
+            self._send(503, {"error": str(e)})
+            return
+        self._send(201, {"id": job_id})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        parts = self._parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send(404, {"error": "not found"})
+        elif self.service.jobs.get(parts[1]) is None:
+            self._send(404, {"error": "unknown job"})
+        elif self.service.jobs.cancel(parts[1]):
+            self._send(200, self.service.jobs.get(parts[1]))
+        else:
+            self._send(409, {"error": "job is already running or finished"})
+
+    def _authorized(self, public: bool = False) -> bool:
+        """
+        Reject requests for foreign Host names and, unless public, without the service token
+        Sends the error response and returns False when rejected
+        """
+        if not self.service.socket_path:
+            host = urlsplit("//" + self.headers.get("Host", "")).hostname or ""
+            if host not in _LOCAL_HOSTS | {self.service.address[0]}:
+                self._send(403, {"error": "unexpected Host header"})
+                return False
+        if public or not self.service.token:
+            return True
+        scheme, _, token = self.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.service.token.encode()):
+            self._send(401, {"error": "missing or invalid token"})
+            return False
+        return True
+
+    def _parts(self):
+        return [part for part in self.path.split("?", 1)[0].split("/") if part]
+
+    def _send_job(self, job_id: str):
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            self._send(404, {"error": "unknown job"})
+        else:
+            self._send(200, job)
+
+    def _send(self, status: int, payload) -> None:
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, job_id: str):
+        """
+        Write the job's current state, then one JSON line per update until it finishes
+        The state is repeated every 15 seconds while nothing changes
+        """
+        updates = queue.Queue()
+        listener = lambda job: updates.put(job) if job["id"] == job_id else None
+        self.service.jobs.add_listener(listener)
+        try:
+            job = self.service.jobs.get(job_id)
+            if job is None:
+                self._send(404, {"error": "unknown job"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            while True:
+                self.wfile.write(json.dumps(job, default=str).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                if job["state"] in _FINISHED:
+                    break
+                try:
+                    job = updates.get(timeout=15)
+                except queue.Empty:
+                    # Repeat the current state as a heartbeat, which also notices gone clients
+                    job = self.service.jobs.get(job_id)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.service.jobs.remove_listener(listener)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format, *args):
+        self.service.logger.debug(f"service {self.address_string()} - {format % args}")
+
+
+class OrganizerService:
+    def __init__(self, config: Dict, logger: logging.Logger):
+        """
+        Resident organizer with a warm FileOrganizer behind a local HTTP API
+        Listens on a Unix socket when service.socket is set, else on service.host:service.port
+        Requests need service.token; over TCP without one, a random token is written to
+        service.token_file (readable only by the user) when the service starts
+        """
+        self.config = config
+        self.logger = logger
+        settings = config.get('service', {})
+        self.socket_path = settings.get('socket', '')
+        self.address: Tuple[str, int] = (settings.get('host', '127.0.0.1'), settings.get('port', 8765))
+        self.token = settings.get('token', '')
+        self.token_file = settings.get('token_file') or str(Path.home() / ".aifileorganizer" / "service-token")
+        self.organizer = FileOrganizer(config, logger)
+        self.jobs = JobManager(
+            self.organizer,
+            logger,
+            config.get('jobs', {}).get('max_concurrent', 2),
+            config.get('jobs', {}).get('keep_finished', 100)
+        )
+        self.server: Optional[socketserver.BaseServer] = None
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok",
+            "running": len(self.jobs.jobs("running")),
+            "queued": len(self.jobs.jobs("queued")),
+        }
+
+    def start(self) -> socketserver.BaseServer:
+        """
+        Bind the listening socket; call serve_forever() on the result to handle requests
+        """
+        handler = type("OrganizerHandler", (_Handler,), {"service": self})
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.server = _UnixHTTPServer(self.socket_path, handler)
+            os.chmod(self.socket_path, 0o600)
+            self.logger.info(f"Organizer service listening on {self.socket_path}")
+        else:
+            if not self.token:
+                self.token = secrets.token_urlsafe(32)
+                self._write_token_file()
+            self.server = ThreadingHTTPServer(self.address, handler)
+            self.logger.info(f"Organizer service listening on http://{self.address[0]}:{self.server.server_port}")
+        return self.server
+
+    def _write_token_file(self) -> None:
+        Path(self.token_file).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.token)
+        os.chmod(self.token_file, 0o600)
+        self.logger.info(f"Service token written to {self.token_file}")
+
+    def serve_forever(self) -> None:
+        server = self.server or self.start()
+        try:
+            server.serve_forever()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """
+        Stop listening and let running jobs finish; queued jobs are cancelled
+        """
+        server, self.server = self.server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self.jobs.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.config import load_config
+    from utils.logger import setup_logger
+
+    parser = argparse.ArgumentParser(description="Run the file organizer as a local service")
+    parser.add_argument("--host", help="Address to listen on")
+    parser.add_argument("--port", type=int, help="TCP port to listen on")
+    parser.add_argument("--socket", help="Unix socket path (instead of TCP)")
+    args = parser.parse_args()
+
+    config = load_config()
+    service_config = config.setdefault('service', {})
+    for key in ("host", "port", "socket"):
+        if getattr(args, key) is not None:
+            service_config[key] = getattr(args, key)
+    service = OrganizerService(config, setup_logger(config))
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,61 @@
+import os
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+
+SHARD_MODES = ("hash", "date")
+
+# Date shard levels, outermost first
+_DATE_LEVELS = ("%Y", "%m", "%d")
+
+
+class ShardTracker:
+    def __init__(self, max_entries: int = 10000, mode: str = "hash", hash_chars: int = 2, max_depth: int = 3):
+        """
+        Keep destination folders below max_entries by sending new files into subfolders
+        Entry counts are kept in memory; each folder is listed at most once, the first time it is used
+        Raises ValueError for unknown modes
+        """
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown sharding mode: {mode}")
+        self.max_entries = max(1, max_entries)
+        self.mode = mode
+        self.hash_chars = max(1, hash_chars)
+        self.max_depth = max_depth if mode == "hash" else min(max_depth, len(_DATE_LEVELS))
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def assign(self, dest_dir: str, target_folder: str, file: Dict) -> str:
+        """
+        Return the folder, relative to dest_dir, that the file should go into
+        A full folder gets one more level of shards, up to max_depth levels
+        """
+        folder = target_folder
+        with self._lock:
+            for level in range(self.max_depth):
+                if self._count(os.path.join(dest_dir, folder)) < self.max_entries:
+                    break
+                folder = os.path.join(folder, self._shard_key(file, level))
+            path = os.path.join(dest_dir, folder)
+            self._counts[path] = self._count(path) + 1
+        return folder
+
+    def _count(self, path: str) -> int:
+        count = self._counts.get(path)
+        if count is None:
+            try:
+                with os.scandir(path) as entries:
+                    count = sum(1 for _ in entries)
+            except OSError:
+                count = 0
+            self._counts[path] = count
+        return count
+
+    def _shard_key(self, file: Dict, level: int) -> str:
+        if self.mode == "date":
+            stamp = datetime.fromtimestamp(file.get('modified', 0), tz=timezone.utc)
+            return stamp.strftime(_DATE_LEVELS[level])
+        digest = hashlib.md5(file.get('name', '').encode('utf-8', 'surrogateescape')).hexdigest()
+        start = level * self.hash_chars
+        return digest[start:start + self.hash_chars]
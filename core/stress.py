@@ -0,0 +1,278 @@
+import os
+import copy
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Default size mix as (size in bytes, weight)
+DEFAULT_SIZE_MIX = [(4 * 1024, 70), (1024 * 1024, 25), (20 * 1024 * 1024, 5)]
+DEFAULT_EXTENSIONS = [".jpg", ".pdf", ".txt", ".mp3", ".mp4", ".zip", ".py", ".bin"]
+MODES = ("oneshot", "watch")
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size_mix(spec: str) -> List[Tuple[int, float]]:
+    """
+    Parse a size mix like "4KB:70,1MB:25,20MB:5" into (bytes, weight) pairs
+    """
+    mix = []
+    for part in spec.split(','):
+        size, _, weight = part.strip().partition(':')
+        size = size.strip().upper()
+        unit = next((u for u in ("GB", "MB", "KB", "B") if size.endswith(u)), "B")
+        number = size[:-len(unit)] if size.endswith(unit) else size
+        mix.append((int(float(number) * _UNITS[unit]), float(weight or 1)))
+    return mix
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        source_dir: str,
+        rate: float,
+        duration: float,
+        size_mix: Optional[List[Tuple[int, float]]] = None,
+        extensions: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+        staging_dir: Optional[str] = None
+    ):
+        """
+        Drop files into a source directory at `rate` files per second for `duration` seconds
+        Files are written in staging_dir (same filesystem, outside the source) and renamed
+        into place, so the organizer never sees a partial file whatever its ignore rules;
+        the arrival time is taken after the rename
+        """
+        self.source_dir = Path(source_dir)
+        self.staging_dir = Path(staging_dir) if staging_dir else self.source_dir.parent / "staging"
+        self.rate = rate
+        self.duration = duration
+        self.size_mix = size_mix or DEFAULT_SIZE_MIX
+        self.extensions = extensions or DEFAULT_EXTENSIONS
+        self.random = random.Random(seed)
+        self.arrivals: Dict[str, float] = {}
+        self.bytes_written = 0
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # One random buffer is reused for all files so generation stays cheap
+        self._payload = os.urandom(min(max(size for size, _ in self.size_mix), 4 * 1024 * 1024))
+
+    def start(self) -> None:
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="load-generator", daemon=True)
+        self._thread.start()
+
+    def join(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.arrivals)
+
+    def _run(self) -> None:
+        sizes = [size for size, _ in self.size_mix]
+        weights = [weight for _, weight in self.size_mix]
+        started = time.monotonic()
+        index = 0
+        try:
+            while True:
+                # Files are spaced evenly; a slow disk makes the generator catch up in bursts
+                due = started + index / self.rate if self.rate > 0 else time.monotonic()
+                if due - started >= self.duration:
+                    break
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                size = self.random.choices(sizes, weights)[0]
+                name = f"load_{index:07d}{self.random.choice(self.extensions)}"
+                self._write(name, size)
+                index += 1
+        except Exception as e:
+            # Reported by the harness instead of silently ending the load
+            self.error = e
+        finally:
+            self.done.set()
+
+    def _write(self, name: str, size: int) -> None:
+        partial = self.staging_dir / f"{name}.part"
+        with open(partial, 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                chunk = self._payload[:remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+        os.rename(partial, self.source_dir / name)
+        with self._lock:
+            self.arrivals[name] = time.time()
+            self.bytes_written += size
+
+
+class StressHarness:
+    def __init__(self, config: Dict, logger: logging.Logger, workdir: Optional[str] = None):
+        """
+        Measure arrival-to-organized latency of FileOrganizer under a steady file load
+        Source and destination are created under workdir (a temporary directory by default)
+        The organizer runs on a copy of config whose catalog, snapshots and inventories
+        are kept in workdir too, so the user's own state is left alone
+        """
+        self.logger = logger
+        self.workdir = Path(workdir or tempfile.mkdtemp(prefix="organizer-stress-"))
+        self.source_dir = self.workdir / "incoming"
+        self.dest_dir = self.workdir / "organized"
+        self.staging_dir = self.workdir / "staging"
+        self.config = self._isolated_config(config)
+
+    def _isolated_config(self, config: Dict) -> Dict:
+        state_dir = self.workdir / "state"
+        isolated = copy.deepcopy(config)
+        isolated.setdefault('catalog', {})['path'] = str(state_dir / "catalog.db")
+        isolated.setdefault('snapshot', {})['directory'] = str(state_dir / "snapshots")
+        isolated.setdefault('inventory', {})['directory'] = str(state_dir / "inventories")
+        isolated.setdefault('metrics', {})['textfile'] = ""
+        return isolated
+
+    def run(
+        self,
+        rate: float = 20,
+        duration: float = 30,
+        size_mix: Optional[List[Tuple[int, float]]] = None,
+        mode: str = "oneshot",
+        drain_timeout: float = 60,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Generate load while driving the organizer, then wait for the backlog to drain
+        oneshot runs organize passes back to back; watch runs a pass on filesystem events
+        Returns throughput and latency percentiles in seconds
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        from core.organizer import FileOrganizer
+
+        self.source_dir.mkdir(parents=True, exist_ok=True)
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        organizer = FileOrganizer(self.config, self.logger)
+        generator = LoadGenerator(
+            str(self.source_dir), rate, duration, size_mix, seed=seed, staging_dir=str(self.staging_dir)
+        )
+        organized_at: Dict[str, float] = {}
+        passes = 0
+
+        wake = threading.Event()
+        observer = self._start_watch(wake) if mode == "watch" else None
+        started = time.time()
+        generator.start()
+        try:
+            deadline = None
+            while True:
+                if generator.done.is_set():
+                    if deadline is None:
+                        deadline = time.time() + drain_timeout
+                    if len(organized_at) >= len(generator.arrivals) or time.time() > deadline:
+                        break
+                if observer is not None:
+                    wake.wait(timeout=0.5)
+                    wake.clear()
+                results = organizer.organize(str(self.source_dir), str(self.dest_dir))
+                passes += 1
+                if observer is None and not results.get("total_files"):
+                    time.sleep(0.01)
+                self._mark_organized(generator.snapshot(), organized_at)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            generator.join()
+        elapsed = time.time() - started
+
+        arrivals = generator.snapshot()
+        latencies = np.array([organized_at[name] - arrivals[name] for name in organized_at])
+        report = {
+            "mode": mode,
+            "rate": rate,
+            "duration": duration,
+            "passes": passes,
+            "generated": len(arrivals),
+            "organized": len(organized_at),
+            "pending": len(arrivals) - len(organized_at),
+            "bytes_written": generator.bytes_written,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_files_per_second": round(len(organized_at) / elapsed, 2) if elapsed else 0.0,
+        }
+        if generator.error is not None:
+            self.logger.error(f"Load generation stopped early: {generator.error}")
+            report["generator_error"] = str(generator.error)
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            report["latency_seconds"] = {
+                "p50": round(float(p50), 4),
+                "p95": round(float(p95), 4),
+                "p99": round(float(p99), 4),
+                "max": round(float(latencies.max()), 4),
+                "mean": round(float(latencies.mean()), 4),
+            }
+        return report
+
+    def _mark_organized(self, arrivals: Dict[str, float], organized_at: Dict[str, float]) -> None:
+        """
+        Files that arrived but are no longer in the source have been organized
+        """
+        now = time.time()
+        present = {entry.name for entry in os.scandir(self.source_dir)}
+        for name in arrivals:
+            if name not in organized_at and name not in present:
+                organized_at[name] = now
+
+    def _start_watch(self, wake: threading.Event):
+        """
+        Wake the driver loop whenever a file lands in the source directory
+        """
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                wake.set()
+
+            def on_moved(self, event):
+                wake.set()
+
+        observer = Observer()
+        observer.schedule(_Handler(), str(self.source_dir), recursive=False)
+        observer.start()
+        return observer
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.config import load_config
+    from utils.logger import setup_logger
+
+    parser = argparse.ArgumentParser(description="Measure arrival-to-organized latency under load")
+    parser.add_argument("--rate", type=float, default=20, help="Files per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--sizes", default="4KB:70,1MB:25,20MB:5", help="Size mix as size:weight,...")
+    parser.add_argument("--mode", choices=MODES, default="oneshot")
+    parser.add_argument("--workdir", help="Directory for the source and destination trees")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = load_config()
+    logger = setup_logger(config)
+    harness = StressHarness(config, logger, args.workdir)
+    print(json.dumps(harness.run(
+        rate=args.rate,
+        duration=args.duration,
+        size_mix=parse_size_mix(args.sizes),
+        mode=args.mode,
+        seed=args.seed
+    ), indent=2))
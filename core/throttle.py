@@ -0,0 +1,77 @@
+import time
+import threading
+from typing import List, Dict, Tuple
+
+# Ordering policies for file operations, mapped to (sort key, reverse)
+ORDER_POLICIES = {
+    "none": None,
+    "smallest_first": (lambda f: f.get('size', 0), False),
+    "largest_first": (lambda f: f.get('size', 0), True),
+    "oldest_first": (lambda f: f.get('modified', 0), False),
+    "newest_first": (lambda f: f.get('modified', 0), True),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Thread-safe token bucket refilled at `rate` tokens per second
+        A rate of 0 or less means unlimited
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: float) -> float:
+        """
+        Take tokens, sleeping until the bucket can pay for them
+        Requests larger than the capacity go into debt, so they still average out to the rate
+        Returns the time spent waiting
+        """
+        if self.rate <= 0 or amount <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class IOThrottle:
+    def __init__(self, bytes_per_second: float = 0, ops_per_second: float = 0):
+        """
+        Combined bandwidth and operation-rate limit for file operations
+        """
+        self.bytes = TokenBucket(bytes_per_second)
+        self.ops = TokenBucket(ops_per_second)
+
+    @property
+    def enabled(self) -> bool:
+        return self.bytes.rate > 0 or self.ops.rate > 0
+
+    def acquire(self, nbytes: int) -> float:
+        """
+        Wait until one operation transferring nbytes is allowed
+        Returns the time spent waiting
+        """
+        return self.ops.consume(1) + self.bytes.consume(nbytes)
+
+
+def order_operations(files: List[Dict], targets: List[str], policy: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Reorder files and their planned targets according to an ordering policy
+    Raises ValueError for unknown policies
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Unknown ordering policy: {policy}")
+    if ORDER_POLICIES[policy] is None or len(files) < 2:
+        return files, targets
+    key, reverse = ORDER_POLICIES[policy]
+    order = sorted(range(len(files)), key=lambda i: key(files[i]), reverse=reverse)
+    return [files[i] for i in order], [targets[i] for i in order]
@@ -3,9 +3,10 @@ from tkinter import ttk, messagebox
 from pathlib import Path
 from typing import Dict
 from core.organizer import FileOrganizer
-from gui.widgets import PathSelector, ToggleSwitch, ProgressDialog, CollapsiblePane
+from core.fast_copy import COPY_STRATEGIES
+from core.jobs import JobManager
+from gui.widgets import PathSelector, ToggleSwitch, CollapsiblePane
 from utils.config import save_config, load_config
-import threading
 import platform
 import logging
 from tkinter import font as tkfont
@@ -16,6 +17,14 @@ class MainWindow:
         self.config = config
         self.logger = logger
         self.organizer = FileOrganizer(config, logger)
+        self.job_manager = JobManager(
+            self.organizer,
+            logger,
+            config.get('jobs', {}).get('max_concurrent', 2),
+            config.get('jobs', {}).get('keep_finished', 100)
+        )
+        # Job updates arrive on worker threads and are handed to the Tk thread
+        self.job_manager.add_listener(lambda job: self.root.after(0, self._on_job_update, job))
         
         # Window setup
         self._setup_window()
@@ -250,6 +259,24 @@ class MainWindow:
         )
         keep_orig_toggle.pack(anchor='w', fill='x', pady=2)
         
+        # Copy strategy used when keeping originals
+        strategy_frame = ttk.Frame(self.behavior_frame.content)
+        strategy_frame.pack(anchor='w', fill='x', pady=2)
+        ttk.Label(strategy_frame, text="Copy strategy:").pack(side='left', padx=(0, 5))
+        self.copy_strategy_var = tk.StringVar(value=self.config['behavior'].get('copy_strategy', 'copy'))
+        strategy_box = ttk.Combobox(
+            strategy_frame,
+            textvariable=self.copy_strategy_var,
+            values=COPY_STRATEGIES,
+            state='readonly',
+            width=12
+        )
+        strategy_box.pack(side='left')
+        strategy_box.bind(
+            "<<ComboboxSelected>>",
+            lambda e: self._update_config('behavior', 'copy_strategy', self.copy_strategy_var.get())
+        )
+        
         # Expand by default
         self.behavior_frame.toggle()
     
@@ -352,7 +379,22 @@ class MainWindow:
         )
         self.results_frame.grid(row=row, column=0, sticky='nsew')
         self.results_frame.columnconfigure(0, weight=1)
-        self.results_frame.rowconfigure(0, weight=1)
+        self.results_frame.rowconfigure(1, weight=1)
+        
+        # Catalog search box
+        search_frame = ttk.Frame(self.results_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 8))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="Find organized files:").grid(row=0, column=0, padx=(0, 5))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.grid(row=0, column=1, sticky='ew')
+        search_entry.bind('<Return>', lambda e: self._search_catalog())
+        ttk.Button(
+            search_frame,
+            text="Search",
+            command=self._search_catalog
+        ).grid(row=0, column=2, padx=(5, 0))
         
         # Treeview with scrollbar
         self.results_tree = ttk.Treeview(
@@ -380,8 +422,8 @@ class MainWindow:
         self.results_tree.configure(yscrollcommand=scrollbar.set)
         
         # Grid layout
-        self.results_tree.grid(row=0, column=0, sticky='nsew')
-        scrollbar.grid(row=0, column=1, sticky='ns')
+        self.results_tree.grid(row=1, column=0, sticky='nsew')
+        scrollbar.grid(row=1, column=1, sticky='ns')
     
     def _create_status_bar(self, row):
         """Create status bar"""
@@ -425,6 +467,7 @@ class MainWindow:
         self.ai_enabled_var.set(self.config['ai']['enable_suggestions'])
         self.api_key_var.set(self.config['ai']['api_key'])
         self.keep_originals_var.set(self.config['behavior'].get('keep_originals', False))
+        self.copy_strategy_var.set(self.config['behavior'].get('copy_strategy', 'copy'))
     
     def _update_config(self, section, key, value):
         """Update configuration value"""
@@ -438,20 +481,7 @@ class MainWindow:
         save_config(self.config)
     
     def _organize_files_threaded(self):
-        """Run file organization in a separate thread"""
-        # Disable button during operation
-        self.organize_btn.config(state='disabled')
-        self.status_var.set("Organizing files...")
-        self.results_tree.delete(*self.results_tree.get_children())
-        self.progress_dialog = ProgressDialog(self.root, "Organizing Files")
-        
-        thread = threading.Thread(target=self._organize_files, daemon=True)
-        thread.start()
-        
-        self.root.after(100, self._check_thread, thread)
-    
-    def _organize_files(self):
-        """Perform the file organization"""
+        """Queue an organize job; several jobs can be queued while others run"""
         source = self.source_selector.get_path()
         dest = self.dest_selector.get_path()
         use_ai = self.ai_enabled_var.get()
@@ -461,56 +491,76 @@ class MainWindow:
             messagebox.showerror("Error", "Please select both source and destination directories")
             return
         
-        try:
-            # Validate paths
-            is_valid, msg = self.organizer.validate_paths(source, dest)
-            if not is_valid:
-                messagebox.showerror("Error", msg)
-                return
-            
-            # Perform organization
-            results = self.organizer.organize(source, dest, use_ai, keep_originals)
-            self._show_results(results)
-            
-        except Exception as e:
-            self.logger.error(f"Organization error: {e}")
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-        finally:
-            if hasattr(self, 'progress_dialog'):
-                self.progress_dialog.destroy()
+        # Validate paths
+        is_valid, msg = self.organizer.validate_paths(source, dest)
+        if not is_valid:
+            messagebox.showerror("Error", msg)
+            return
+        
+        # A new batch starts with an empty result list; jobs of the same batch append to it
+        if not self.job_manager.jobs('running') and not self.job_manager.jobs('queued'):
+            self.results_tree.delete(*self.results_tree.get_children())
+        
+        job_id = self.job_manager.submit(source, dest, use_ai, keep_originals)
+        self.status_var.set(f"Queued {job_id}: {source}")
     
-    def _check_thread(self, thread):
-        """Check if the organization thread is done"""
-        if thread.is_alive():
-            self.root.after(100, self._check_thread, thread)
-        else:
-            if hasattr(self, 'progress_dialog'):
-                self.progress_dialog.destroy()
-            self.organize_btn.config(state='normal')
+    def _on_job_update(self, job: Dict):
+        """Reflect a job state change; called on the Tk thread"""
+        if job['state'] == 'completed':
+            self._show_results(job['results'], job['id'])
+        elif job['state'] == 'failed':
+            self.results_tree.insert('', 'end', values=("FAILED", f"{job['id']} ({job['source']}): {job['error']}"))
+        
+        running = len(self.job_manager.jobs('running'))
+        queued = len(self.job_manager.jobs('queued'))
+        if running or queued:
+            self.status_var.set(f"{job['id']} {job['state']} - {running} running, {queued} queued")
+        elif job['state'] != 'completed':
+            self.status_var.set(f"{job['id']} {job['state']}")
     
-    def _show_results(self, results: Dict):
-        """Display organization results"""
-        self.results_tree.delete(*self.results_tree.get_children())
+    def _show_results(self, results: Dict, job_id: str = ""):
+        """Append a job's organization results below those of earlier jobs"""
+        prefix = f"[{job_id}] " if job_id else ""
+        
+        def add(status, message):
+            self.results_tree.insert('', 'end', values=(status, prefix + message))
         
         # Add summary
-        self.results_tree.insert('', 'end', values=("COMPLETED", f"Processed {results['total_files']} files"))
-        self.results_tree.insert('', 'end', values=("SUCCESS", f"{results['organized']} files organized"))
+        add("COMPLETED", f"Processed {results['total_files']} files")
+        add("SUCCESS", f"{results['organized']} files organized")
         
         if results['failures'] > 0:
-            self.results_tree.insert('', 'end', values=("FAILED", f"{results['failures']} files could not be processed"))
+            add("FAILED", f"{results['failures']} files could not be processed")
         
         # Add mode info
         mode = "COPIED" if results['operation_mode'] == 'copy' else "MOVED"
-        self.results_tree.insert('', 'end', values=("MODE", f"Files were {mode.lower()} to destination"))
+        add("MODE", f"Files were {mode.lower()} to destination")
+        if results.get('copy_strategies'):
+            add("STRATEGY", ", ".join(f"{name}: {count}" for name, count in results['copy_strategies'].items()))
+        
+        if results.get('ai_timed_out'):
+            add("AI", "AI results did not arrive in time and were skipped")
         
         # Add AI suggestions if available
         if results.get('suggestions'):
-            self.results_tree.insert('', 'end', values=("SUGGESTIONS", ""))
+            add("SUGGESTIONS", "")
             for suggestion in results['suggestions']:
-                self.results_tree.insert('', 'end', values=("", suggestion))
+                add("", suggestion)
         
         # Update status
-        self.status_var.set(f"Done. {results['organized']}/{results['total_files']} files processed in {results['execution_time']}s")
+        self.status_var.set(f"{prefix}Done. {results['organized']}/{results['total_files']} files processed in {results['execution_time']}s")
+    
+    def _search_catalog(self):
+        """Show catalog entries matching the search box"""
+        if not self.config.get('catalog', {}).get('enabled', False):
+            messagebox.showinfo("Catalog", "The catalog is disabled in the settings")
+            return
+        
+        matches = self.organizer.search_catalog(self.search_var.get())
+        self.results_tree.delete(*self.results_tree.get_children())
+        for match in matches:
+            self.results_tree.insert('', 'end', values=("FOUND", f"{match['name']} -> {match['new_path']}"))
+        self.status_var.set(f"{len(matches)} catalog matches")
     
     def _reset_defaults(self):
         """Reset configuration to defaults"""
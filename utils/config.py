@@ -14,11 +14,94 @@ DEFAULT_CONFIG = {
     },
     "ai": {
         "enable_suggestions": True,
-        "categorization_model": "default",
-        "api_key": ""
+        "categorization_model": "default",  # default (AI service) or local (filename clustering, no API)
+        "api_key": "",
+        "timeout": 10,  # Seconds to wait for AI results once files are organized
+        "prompt_token_budget": 1500  # Prompt size limit; files are summarized to fit
     },
     "behavior": {
-        "keep_originals": False  # New: Default to move files (not keep copies)
+        "keep_originals": False,  # New: Default to move files (not keep copies)
+        "copy_strategy": "copy",  # copy, reflink, hardlink or symlink when keeping originals
+        "order": "none",  # none, smallest_first, largest_first, oldest_first or newest_first
+        "verify_copies": "off",  # off, size or reread: hash copies in the same pass as copying
+        "hash_algorithm": "sha256"
+    },
+    "throttle": {
+        "bytes_per_second": 0,  # 0 means unlimited
+        "ops_per_second": 0
+    },
+    "ignore": {
+        "patterns": ["*.part", "*.crdownload", "*.tmp"],  # gitignore-style excludes
+        "file": ".organizerignore",  # More patterns, read from the source root if present
+        "recursive": False  # Descend into subdirectories; ignored ones are never entered
+    },
+    "jobs": {
+        "max_concurrent": 2,  # Organize jobs running at once; the rest wait by priority
+        "keep_finished": 100  # Finished jobs (with their results) remembered for status queries
+    },
+    "service": {
+        "host": "127.0.0.1",  # Local HTTP API of the resident service (python -m core.service)
+        "port": 8765,
+        "socket": "",  # Unix socket path (mode 0600); used instead of host/port when set
+        "token": "",  # Bearer token for API requests; over TCP a random one is generated when empty
+        "token_file": str(Path.home() / ".aifileorganizer" / "service-token")  # Where a generated token is written
+    },
+    "metrics": {
+        "port": 0,  # Serve Prometheus metrics on 127.0.0.1:<port>/metrics; 0 disables
+        "textfile": ""  # Write metrics here after each run for node_exporter's textfile collector
+    },
+    "io": {
+        "max_workers": 8,  # Parallel jobs across all devices
+        "per_device_concurrency": 1,  # Jobs reading from the same source device at once
+        "per_destination_concurrency": 4  # Jobs writing to the same destination device at once
+    },
+    "classifier": {
+        "enabled": False,  # Offline content classifier for files that would go to "others"
+        "sample_bytes": 4096,
+        "min_confidence": 0.35,
+        "max_training_files": 200,  # Per category folder in the destination
+        "batch_size": 1024  # Files classified at once; bounds memory for large scans
+    },
+    "image_metadata": {
+        "enabled": False,  # Read EXIF headers to sort photos by date and camera
+        "folder_template": "{category}/{year}/{month}",  # Also {day} and {camera}
+        "workers": None  # Process pool size, defaults to CPU count
+    },
+    "archive_inspection": {
+        "enabled": False,  # List zip/tar contents (metadata only) to sort archives by what they hold
+        "folder_template": "{category}/{content}",  # content is e.g. images, documents or mixed
+        "workers": None  # Process pool size, defaults to CPU count
+    },
+    "snapshot": {
+        "enabled": False,  # Only re-list directories whose mtime changed since the last run
+        "directory": str(Path.home() / ".aifileorganizer" / "snapshots")
+    },
+    "inventory": {
+        "enabled": False,  # Save each scan as a memory-mapped inventory and diff runs
+        "directory": str(Path.home() / ".aifileorganizer" / "inventories")
+    },
+    "sharding": {
+        "enabled": False,  # Split destination folders that grow past max_entries
+        "max_entries": 10000,
+        "mode": "hash",  # hash (name hash prefix) or date (year/month/day of modification)
+        "hash_chars": 2,  # Hex characters per hash level, 2 gives 256 subfolders
+        "max_depth": 3
+    },
+    "catalog": {
+        "enabled": False,  # Record every organized file in a searchable SQLite catalog
+        "path": str(Path.home() / ".aifileorganizer" / "catalog.db"),
+        "batch_size": 500  # Entries written per transaction
+    },
+    "distributed": {
+        "lease_seconds": 300,  # Chunks whose lease is not renewed in time are reclaimed
+        "chunk_size": 500  # Files per chunk claimed by a queue worker
+    },
+    "pipeline": {
+        "enabled": False,  # Overlap scanning, type detection, planning and moving
+        "batch_size": 100,  # Files handed between stages at a time
+        "queue_size": 1000,  # Files buffered between stages before producers wait
+        "detect_workers": 4,
+        "execute_workers": 2
     },
     "file_types": {
         "documents": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt"],
@@ -27,7 +110,12 @@ DEFAULT_CONFIG = {
         "videos": [".mp4", ".avi", ".mov", ".mkv"],
         "archives": [".zip", ".rar", ".7z", ".tar"],
         "code": [".py", ".js", ".html", ".css", ".java", ".cpp"]
-    }
+    },
+    # Custom rules, highest priority first. Each rule may set "pattern" (glob) or
+    # "regex", "min_size"/"max_size" (bytes), "min_age_days"/"max_age_days",
+    # "mime" (glob like "image/*") and a "target" template using
+    # {category}, {year}, {month}, {day} and {extension}
+    "rules": []
 }
 
 def load_config():